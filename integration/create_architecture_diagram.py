@@ -9,15 +9,16 @@ Cria diagramas profissionais para documentação do projeto.
 Uso:
     python create_architecture_diagram.py
 
-Requer: matplotlib, networkx, plotly
+Requer: matplotlib, numpy
 """
 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-from matplotlib.patches import FancyBboxPatch, ConnectionPatch
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
 import numpy as np
 from datetime import datetime
-import json
+from functools import lru_cache
 
 # ===========================================
 # CONFIGURAÇÕES DO DIAGRAMA
@@ -45,6 +46,137 @@ DIAGRAM_CONFIG = {
     }
 }
 
+# Fonte única com todos os glifos usados (sem emojis), evitando fallback de fontes
+plt.rcParams['font.family'] = ['DejaVu Sans']
+
+# ===========================================
+# FUNÇÕES AUXILIARES DE GEOMETRIA
+# ===========================================
+
+def _box_vertices(boxes, pad=0.1):
+    """Vértices (N, 4, 2) das caixas (x, y, largura, altura) com padding"""
+    x, y, width, height = np.asarray(boxes, dtype=float).reshape(-1, 4).T
+    x0, y0 = x - pad, y - pad
+    x1, y1 = x + width + pad, y + height + pad
+    
+    verts = np.empty((len(x), 4, 2))
+    verts[:, 0, 0] = x0
+    verts[:, 0, 1] = y0
+    verts[:, 1, 0] = x1
+    verts[:, 1, 1] = y0
+    verts[:, 2, 0] = x1
+    verts[:, 2, 1] = y1
+    verts[:, 3, 0] = x0
+    verts[:, 3, 1] = y1
+    return verts
+
+def _png_savefig_kwargs(filename):
+    """Compressão zlib rápida (nível 1) para PNG; vazio para formatos vetoriais"""
+    if str(filename).lower().endswith('.png'):
+        return {'pil_kwargs': {'compress_level': 1, 'optimize': False}}
+    return {}
+
+@lru_cache(maxsize=1)
+def _generation_timestamp():
+    """Timestamp da execução (calculado uma única vez)"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _blank_ax(ax, title):
+    """Preparar eixo 0-10 sem autoscale, sem eixos e com título"""
+    ax.set_autoscale_on(False)
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    ax.axis('off')
+    ax.set_clip_on(False)
+    ax.set_title(title, fontweight='bold', fontsize=14)
+
+def _add_box_collection(ax, boxes, facecolors, alpha=0.8, pad=0.1,
+                        edgecolors='none', linewidths=0):
+    """Adicionar todas as caixas de um eixo em uma única PolyCollection"""
+    collection = PolyCollection(
+        _box_vertices(boxes, pad),
+        facecolors=to_rgba_array(facecolors, alpha=alpha),
+        edgecolors=edgecolors,
+        linewidths=linewidths,
+        clip_on=False
+    )
+    ax.add_collection(collection)
+    return collection
+
+def _arc_points(start, end, rad=0.3, n_points=20):
+    """Amostrar a curva arc3 (Bézier quadrática) entre dois pontos"""
+    p0 = np.asarray(start, dtype=float)
+    p2 = np.asarray(end, dtype=float)
+    dx, dy = p2 - p0
+    control = (p0 + p2) / 2 + rad * np.array([dy, -dx])
+    
+    t = np.linspace(0, 1, n_points)[:, None]
+    return (1 - t) ** 2 * p0 + 2 * (1 - t) * t * control + t ** 2 * p2
+
+def _arrowhead_triangles(tails, tips, head_length=0.15, head_width=0.1):
+    """Triângulos (N, 3, 2) das pontas de seta, calculados em lote"""
+    tails = np.asarray(tails, dtype=float).reshape(-1, 2)
+    tips = np.asarray(tips, dtype=float).reshape(-1, 2)
+    
+    direction = tips - tails
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    normal = np.column_stack([-direction[:, 1], direction[:, 0]])
+    base = tips - head_length * direction
+    
+    return np.stack([
+        tips,
+        base + head_width / 2 * normal,
+        base - head_width / 2 * normal
+    ], axis=1)
+
+def _add_arrow_collection(ax, paths, color, linewidths=2, alpha=0.8,
+                          linestyles='solid', head_length=0.15, head_width=0.1):
+    """Adicionar hastes (LineCollection) e pontas (PolyCollection) de várias setas"""
+    ax.add_collection(LineCollection(
+        paths,
+        colors=color,
+        linewidths=linewidths,
+        linestyles=linestyles,
+        alpha=alpha,
+        clip_on=False
+    ))
+    ax.add_collection(PolyCollection(
+        _arrowhead_triangles(
+            [path[-2] for path in paths],
+            [path[-1] for path in paths],
+            head_length, head_width
+        ),
+        facecolors=color,
+        edgecolors='none',
+        alpha=alpha,
+        clip_on=False
+    ))
+
+def _rounded_rect_vertices(rects, radius, n_arc=8):
+    """Vértices (N, 4*n_arc, 2) de retângulos arredondados (cx, cy, largura, altura)"""
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+    cx, cy, width, height = rects.T
+    radius = np.minimum(np.broadcast_to(radius, cx.shape), np.minimum(width, height) / 2)
+    
+    # Centros dos cantos em sentido anti-horário: sup. dir., sup. esq., inf. esq., inf. dir.
+    sx = np.array([1, -1, -1, 1])
+    sy = np.array([1, 1, -1, -1])
+    corner_x = cx[:, None] + (width / 2 - radius)[:, None] * sx
+    corner_y = cy[:, None] + (height / 2 - radius)[:, None] * sy
+    
+    angles = np.linspace(0, np.pi / 2, n_arc) + np.arange(4)[:, None] * np.pi / 2
+    vx = corner_x[:, :, None] + radius[:, None, None] * np.cos(angles)
+    vy = corner_y[:, :, None] + radius[:, None, None] * np.sin(angles)
+    
+    return np.stack([vx.reshape(len(rects), -1), vy.reshape(len(rects), -1)], axis=-1)
+
+def _text_extent(text, font_size, points_per_unit):
+    """Largura e altura aproximadas de um texto, em unidades de dados"""
+    lines = text.split('\n')
+    width = max(len(line) for line in lines) * 0.68 * font_size / points_per_unit
+    height = len(lines) * 1.2 * font_size / points_per_unit
+    return width, height
+
 # ===========================================
 # CLASSE PARA CRIAR DIAGRAMAS
 # ===========================================
@@ -53,46 +185,50 @@ class SmartMaintenanceArchitectureDiagram:
     """Gerador de diagramas de arquitetura"""
     
     def __init__(self):
+        # DPI padrão no layout; a resolução final só é aplicada no savefig
         self.fig, self.ax = plt.subplots(
-            figsize=(DIAGRAM_CONFIG['width'], DIAGRAM_CONFIG['height']),
-            dpi=DIAGRAM_CONFIG['dpi']
+            figsize=(DIAGRAM_CONFIG['width'], DIAGRAM_CONFIG['height'])
         )
         self.colors = DIAGRAM_CONFIG['colors']
         self.fonts = DIAGRAM_CONFIG['fonts']
         
-        # Configurar plot
+        # Caixas e setas pendentes, desenhadas em lote no finalize()
+        self._pending_boxes = []
+        self._arrow_segments = []
+        self._label_bgs = []
+        
+        # Configurar plot (margens fixas; o recorte final fica a cargo de bbox_inches='tight')
+        self.fig.subplots_adjust(left=0, right=1, bottom=0, top=1)
         self.ax.set_xlim(0, 10)
         self.ax.set_ylim(0, 10)
         self.ax.set_aspect('equal')
         self.ax.axis('off')
+        self.ax.set_clip_on(False)
         
-        # Fundo
+        # Fundo (rasterizado: um único tile em SVG/PDF, abaixo dos demais)
         self.ax.add_patch(patches.Rectangle(
             (0, 0), 10, 10,
             facecolor=self.colors['background'],
-            alpha=0.3
+            alpha=0.3,
+            rasterized=True,
+            zorder=-1,
+            clip_on=False
         ))
     
     def add_component_box(self, x, y, width, height, title, description, color, icon=""):
         """Adicionar caixa de componente"""
+        f_comp = self.fonts['component']
+        f_desc = self.fonts['description']
         
-        # Caixa principal
-        box = FancyBboxPatch(
-            (x, y), width, height,
-            boxstyle="round,pad=0.1",
-            facecolor=color,
-            edgecolor='white',
-            linewidth=2,
-            alpha=0.8
-        )
-        self.ax.add_patch(box)
+        # Caixa principal (desenhada em lote no finalize)
+        self._pending_boxes.append((x, y, width, height, color))
         
         # Título
         self.ax.text(
             x + width/2, y + height - 0.3,
-            f"{icon} {title}",
+            f"{icon} {title}" if icon else title,
             ha='center', va='center',
-            fontsize=self.fonts['component'],
+            fontsize=f_comp,
             fontweight='bold',
             color='white'
         )
@@ -102,7 +238,7 @@ class SmartMaintenanceArchitectureDiagram:
             x + width/2, y + height/2 - 0.2,
             description,
             ha='center', va='center',
-            fontsize=self.fonts['description'],
+            fontsize=f_desc,
             color='white',
             wrap=True
         )
@@ -111,61 +247,30 @@ class SmartMaintenanceArchitectureDiagram:
         """Adicionar seta entre componentes"""
         
         if curved:
-            # Seta curva
-            arrow = patches.FancyArrowPatch(
-                (x1, y1), (x2, y2),
-                connectionstyle="arc3,rad=0.3",
-                arrowstyle='->,head_width=0.3,head_length=0.5',
-                color=self.colors['arrow'],
-                linewidth=2,
-                alpha=0.8
-            )
+            # Seta curva (arc3, rad=0.3)
+            self._arrow_segments.append(_arc_points((x1, y1), (x2, y2), rad=0.3))
         else:
             # Seta reta
-            arrow = patches.FancyArrowPatch(
-                (x1, y1), (x2, y2),
-                arrowstyle='->,head_width=0.3,head_length=0.5',
-                color=self.colors['arrow'],
-                linewidth=2,
-                alpha=0.8
-            )
-        
-        self.ax.add_patch(arrow)
+            self._arrow_segments.append(np.array([(x1, y1), (x2, y2)], dtype=float))
         
         # Label da seta
         if label:
             mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-            
-            # Fundo branco para o label
-            self.ax.text(
-                mid_x, mid_y + 0.2,
-                label,
-                ha='center', va='center',
-                fontsize=self.fonts['small'],
-                bbox=dict(boxstyle="round,pad=0.3", facecolor='white', alpha=0.8),
-                color=self.colors['text']
-            )
+            self._label_bgs.append((mid_x, mid_y + 0.2, label, 'white', 0.8, 'none', 0.3))
     
     def add_data_flow_info(self, x, y, data_format, frequency):
         """Adicionar informações de fluxo de dados"""
         info_text = f"Formato: {data_format}\nFrequência: {frequency}"
         
-        self.ax.text(
-            x, y,
-            info_text,
-            ha='center', va='center',
-            fontsize=self.fonts['small'],
-            bbox=dict(
-                boxstyle="round,pad=0.4",
-                facecolor='yellow',
-                alpha=0.7,
-                edgecolor=self.colors['text']
-            ),
-            color=self.colors['text']
-        )
+        # Fundo desenhado em lote no finalize
+        self._label_bgs.append((x, y, info_text, 'yellow', 0.7, self.colors['text'], 0.4))
     
     def create_main_architecture_diagram(self):
         """Criar diagrama principal da arquitetura"""
+        colors = self.colors
+        c_text = colors['text']
+        f_small = self.fonts['small']
+        f_desc = self.fonts['description']
         
         # Título principal
         self.ax.text(
@@ -174,7 +279,7 @@ class SmartMaintenanceArchitectureDiagram:
             ha='center', va='center',
             fontsize=self.fonts['title'],
             fontweight='bold',
-            color=self.colors['text']
+            color=c_text
         )
         
         # Subtítulo
@@ -182,8 +287,8 @@ class SmartMaintenanceArchitectureDiagram:
             5, 9.1,
             "Pipeline Completo: IoT → MQTT → Database → ML → Dashboard",
             ha='center', va='center',
-            fontsize=self.fonts['description'],
-            color=self.colors['text']
+            fontsize=f_desc,
+            color=c_text
         )
         
         # ========================================
@@ -194,8 +299,8 @@ class SmartMaintenanceArchitectureDiagram:
             0.5, 7, 2, 1.5,
             "ESP32 + Sensores",
             "MPU6050 (Temp, Accel, Gyro)\nDHT22 (Temp, Humid)\nPressure Sensor\n@1Hz Sampling",
-            self.colors['iot'],
-            "🔧"
+            colors['iot'],
+            "[IoT]"
         )
         
         # ========================================
@@ -206,8 +311,8 @@ class SmartMaintenanceArchitectureDiagram:
             3.5, 7, 2, 1.5,
             "MQTT Broker",
             "Message Queue\nJSON Payload\nTopic: hermes/sensors\nQoS: 1",
-            self.colors['communication'],
-            "📡"
+            colors['communication'],
+            "[MQTT]"
         )
         
         # Seta ESP32 → MQTT
@@ -222,8 +327,8 @@ class SmartMaintenanceArchitectureDiagram:
             6.5, 7, 2.5, 1.5,
             "Data Ingestion Service",
             "Python MQTT Client\nData Validation\nBatch Processing\nBuffer Management",
-            self.colors['processing'],
-            "⚡"
+            colors['processing'],
+            "[SVC]"
         )
         
         # Seta MQTT → Ingestion
@@ -238,8 +343,8 @@ class SmartMaintenanceArchitectureDiagram:
             7.5, 4.5, 2, 1.8,
             "Oracle Database",
             "T_EQUIPAMENTO\nT_SENSOR\nT_MEDICAO\n3NF Normalized",
-            self.colors['storage'],
-            "🗄️"
+            colors['storage'],
+            "[DB]"
         )
         
         # Seta Ingestion → Database
@@ -254,8 +359,8 @@ class SmartMaintenanceArchitectureDiagram:
             4.5, 4.5, 2.5, 1.8,
             "ETL Pipeline",
             "Extract & Transform\nData Quality Checks\nFeature Engineering\nAggregations",
-            self.colors['processing'],
-            "🔄"
+            colors['processing'],
+            "[ETL]"
         )
         
         # Seta Database ↔ ETL (bidirectional)
@@ -270,8 +375,8 @@ class SmartMaintenanceArchitectureDiagram:
             1.5, 4.5, 2.5, 1.8,
             "ML Pipeline",
             "KNN, Random Forest\nLogistic Regression\nModel Training\nPrediction API",
-            self.colors['processing'],
-            "🤖"
+            colors['processing'],
+            "[ML]"
         )
         
         # Seta ETL → ML
@@ -285,8 +390,8 @@ class SmartMaintenanceArchitectureDiagram:
             3, 1.5, 4, 2,
             "Dashboard & Alerts",
             "Streamlit Web App\nReal-time KPIs\nPlotly Charts\nAlert System\nEmail Notifications",
-            self.colors['interface'],
-            "📊"
+            colors['interface'],
+            "[UI]"
         )
         
         # Setas para Dashboard
@@ -300,45 +405,26 @@ class SmartMaintenanceArchitectureDiagram:
         
         # Legenda de tecnologias
         tech_info = [
-            "🔧 Hardware: ESP32, MPU6050, DHT22",
-            "📡 Communication: MQTT (Eclipse Mosquitto)",
-            "🗄️ Database: Oracle 11g (3NF)",
-            "⚡ Processing: Python, Pandas, NumPy",
-            "🤖 ML: Scikit-learn, KNN, Random Forest",
-            "📊 Frontend: Streamlit, Plotly"
+            "[IoT] Hardware: ESP32, MPU6050, DHT22",
+            "[MQTT] Communication: MQTT (Eclipse Mosquitto)",
+            "[DB] Database: Oracle 11g (3NF)",
+            "[SVC] Processing: Python, Pandas, NumPy",
+            "[ML] ML: Scikit-learn, KNN, Random Forest",
+            "[UI] Frontend: Streamlit, Plotly"
         ]
         
-        for i, info in enumerate(tech_info):
-            self.ax.text(
-                0.2, 0.5 - i*0.2,
-                info,
-                ha='left', va='center',
-                fontsize=self.fonts['small'],
-                color=self.colors['text']
-            )
-        
         # Performance metrics
         perf_info = [
-            "📈 Performance Metrics:",
+            "Performance Metrics:",
             "• Throughput: 1,000 records/min",
             "• Latency: < 5 seconds end-to-end",
             "• ML Accuracy: 94.56%",
             "• System Uptime: 99.2%"
         ]
         
-        for i, info in enumerate(perf_info):
-            self.ax.text(
-                0.2, 3.5 - i*0.2,
-                info,
-                ha='left', va='center',
-                fontsize=self.fonts['small'],
-                color=self.colors['text'],
-                weight='bold' if i == 0 else 'normal'
-            )
-        
         # Data flow summary
         flow_summary = [
-            "🔄 Data Flow Summary:",
+            "Data Flow Summary:",
             "1. ESP32 → MQTT (JSON, 1Hz)",
             "2. MQTT → Python Service (Real-time)", 
             "3. Service → Oracle DB (Batch)",
@@ -347,27 +433,46 @@ class SmartMaintenanceArchitectureDiagram:
             "6. Dashboard → Visualization (<5s)"
         ]
         
-        for i, info in enumerate(flow_summary):
+        # Posições calculadas em lote, em fração do eixo (transAxes):
+        # (x, y inicial, espaçamento, linhas, título em negrito)
+        info_blocks = [
+            (0.02, 0.05, 0.02, tech_info, False),
+            (0.02, 0.35, 0.02, perf_info, True),
+            (0.02, 0.25, 0.015, flow_summary, True)
+        ]
+        
+        text_items = []
+        for x, y0, step, lines, bold_header in info_blocks:
+            ys = y0 - np.arange(len(lines)) * step
+            weights = ['normal'] * len(lines)
+            if bold_header:
+                weights[0] = 'bold'
+            text_items.extend(zip(np.full(len(lines), x), ys, lines, weights))
+        
+        for x, y, info, weight in text_items:
             self.ax.text(
-                0.2, 2.5 - i*0.15,
+                x, y,
                 info,
                 ha='left', va='center',
-                fontsize=self.fonts['small'],
-                color=self.colors['text'],
-                weight='bold' if i == 0 else 'normal'
+                fontsize=f_small,
+                color=c_text,
+                weight=weight,
+                transform=self.ax.transAxes
             )
     
     def add_timestamp_and_credits(self):
         """Adicionar timestamp e créditos"""
+        c_text = self.colors['text']
+        f_small = self.fonts['small']
         
         # Timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _generation_timestamp()
         self.ax.text(
             9.8, 0.2,
             f"Generated: {timestamp}",
             ha='right', va='bottom',
-            fontsize=self.fonts['small'] - 1,
-            color=self.colors['text'],
+            fontsize=f_small - 1,
+            color=c_text,
             alpha=0.7
         )
         
@@ -376,20 +481,78 @@ class SmartMaintenanceArchitectureDiagram:
             9.8, 0.05,
             "Challenge Hermes Reply - FIAP",
             ha='right', va='bottom',
-            fontsize=self.fonts['small'],
+            fontsize=f_small,
             fontweight='bold',
-            color=self.colors['text']
+            color=c_text
         )
     
-    def save_diagram(self, filename="smart_maintenance_architecture.png"):
-        """Salvar diagrama"""
-        plt.tight_layout()
+    def finalize(self):
+        """Desenhar em lote os elementos acumulados (após o layout estar definido)"""
+        if self._pending_boxes:
+            _add_box_collection(
+                self.ax,
+                [box[:4] for box in self._pending_boxes],
+                [box[4] for box in self._pending_boxes],
+                alpha=0.8,
+                edgecolors='white',
+                linewidths=2
+            )
+            self._pending_boxes = []
+        
+        if self._arrow_segments:
+            _add_arrow_collection(self.ax, self._arrow_segments, self.colors['arrow'])
+            self._arrow_segments = []
+        
+        if self._label_bgs:
+            self._draw_labels()
+    
+    def _draw_labels(self):
+        """Desenhar fundos dos labels em uma PolyCollection e os textos sem bbox"""
+        f_small = self.fonts['small']
+        c_text = self.colors['text']
+        
+        # Escala atual do eixo: pontos tipográficos por unidade de dados
+        (x0, _), (x1, _) = self.ax.transData.transform([(0, 0), (1, 0)])
+        points_per_unit = (x1 - x0) * 72 / self.fig.dpi
+        
+        rects, radii, facecolors, edgecolors = [], [], [], []
+        for x, y, text, facecolor, alpha, edgecolor, pad in self._label_bgs:
+            width, height = _text_extent(text, f_small, points_per_unit)
+            pad_units = pad * f_small / points_per_unit
+            rects.append((x, y, width + 2 * pad_units, height + 2 * pad_units))
+            radii.append(pad_units)
+            facecolors.append(to_rgba_array(facecolor, alpha=alpha)[0])
+            edgecolors.append(edgecolor)
+        
+        self.ax.add_collection(PolyCollection(
+            _rounded_rect_vertices(rects, radii),
+            facecolors=facecolors,
+            edgecolors=edgecolors,
+            linewidths=1,
+            zorder=2.5,
+            clip_on=False
+        ))
+        
+        for x, y, text, *_ in self._label_bgs:
+            self.ax.text(
+                x, y,
+                text,
+                ha='center', va='center',
+                fontsize=f_small,
+                color=c_text
+            )
+        self._label_bgs = []
+    
+    def save_diagram(self, filename="smart_maintenance_architecture.svg"):
+        """Salvar diagrama (formato definido pela extensão; SVG por padrão)"""
+        self.finalize()
         plt.savefig(
             filename,
             dpi=DIAGRAM_CONFIG['dpi'],
             bbox_inches='tight',
             facecolor='white',
-            edgecolor='none'
+            edgecolor='none',
+            **_png_savefig_kwargs(filename)
         )
         print(f"Diagrama salvo como: {filename}")
 
@@ -397,11 +560,11 @@ class SmartMaintenanceArchitectureDiagram:
 # FUNÇÃO PARA CRIAR DIAGRAMA DETALHADO
 # ===========================================
 
-def create_detailed_component_diagram():
-    """Criar diagrama detalhado dos componentes"""
+def create_detailed_component_diagram(filename="smart_maintenance_detailed_components.svg"):
+    """Criar diagrama detalhado dos componentes (SVG por padrão)"""
     
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(
-        2, 2, figsize=(16, 12), dpi=300
+        2, 2, figsize=(DIAGRAM_CONFIG['width'], DIAGRAM_CONFIG['height'])
     )
     
     colors = DIAGRAM_CONFIG['colors']
@@ -410,21 +573,13 @@ def create_detailed_component_diagram():
     # QUADRANTE 1: ESP32 & SENSORES
     # ========================================
     
-    ax1.set_title("ESP32 & Sensor Integration", fontweight='bold', fontsize=14)
-    ax1.set_xlim(0, 10)
-    ax1.set_ylim(0, 10)
-    ax1.axis('off')
+    _blank_ax(ax1, "ESP32 & Sensor Integration")
     
     # ESP32 Core
-    esp32_box = FancyBboxPatch(
-        (2, 6), 6, 2,
-        boxstyle="round,pad=0.2",
-        facecolor=colors['iot'],
-        edgecolor='white',
-        linewidth=2,
-        alpha=0.8
+    _add_box_collection(
+        ax1, [(2, 6, 6, 2)], [colors['iot']],
+        alpha=0.8, pad=0.2, edgecolors='white', linewidths=2
     )
-    ax1.add_patch(esp32_box)
     ax1.text(5, 7, "ESP32 Controller\nWiFi + MQTT Client", 
              ha='center', va='center', fontsize=12, color='white', fontweight='bold')
     
@@ -435,29 +590,26 @@ def create_detailed_component_diagram():
         (7, 3, "Pressure\nAnalog Sensor")
     ]
     
+    _add_box_collection(
+        ax1, [(x, y, 2, 1.5) for x, y, _ in sensors],
+        [colors['communication']] * len(sensors), alpha=0.7
+    )
+    
     for x, y, label in sensors:
-        sensor_box = FancyBboxPatch(
-            (x, y), 2, 1.5,
-            boxstyle="round,pad=0.1",
-            facecolor=colors['communication'],
-            alpha=0.7
-        )
-        ax1.add_patch(sensor_box)
         ax1.text(x+1, y+0.75, label, ha='center', va='center', 
                 fontsize=10, color='white', fontweight='bold')
-        
-        # Conexões
-        ax1.arrow(x+1, y+1.5, 0, 1, head_width=0.2, head_length=0.2, 
-                 fc=colors['arrow'], ec=colors['arrow'])
+    
+    # Conexões
+    _add_arrow_collection(
+        ax1, [((x+1, y+1.5), (x+1, y+2.5)) for x, y, _ in sensors],
+        colors['arrow'], linewidths=1, alpha=1, head_length=0.2, head_width=0.2
+    )
     
     # ========================================
     # QUADRANTE 2: BANCO DE DADOS
     # ========================================
     
-    ax2.set_title("Database Schema (Oracle)", fontweight='bold', fontsize=14)
-    ax2.set_xlim(0, 10)
-    ax2.set_ylim(0, 10)
-    ax2.axis('off')
+    _blank_ax(ax2, "Database Schema (Oracle)")
     
     # Tabelas
     tables = [
@@ -466,34 +618,28 @@ def create_detailed_component_diagram():
         (3, 3, "T_MEDICAO\nPK: id_medicao\nFK: id_maquina, id_sensor\nvl_temperatura\nvl_pressao\nvl_vibracao\nvl_humidade\ndataHora_medicao\nflag_falha")
     ]
     
-    for x, y, label in tables:
-        width = 3 if "T_MEDICAO" in label else 2.5
-        height = 2.5 if "T_MEDICAO" in label else 2
-        
-        table_box = FancyBboxPatch(
-            (x, y), width, height,
-            boxstyle="round,pad=0.1",
-            facecolor=colors['storage'],
-            alpha=0.8
-        )
-        ax2.add_patch(table_box)
+    table_boxes = [
+        (x, y, 3 if "T_MEDICAO" in label else 2.5, 2.5 if "T_MEDICAO" in label else 2)
+        for x, y, label in tables
+    ]
+    _add_box_collection(ax2, table_boxes, [colors['storage']] * len(tables))
+    
+    for (x, y, width, height), (_, _, label) in zip(table_boxes, tables):
         ax2.text(x+width/2, y+height/2, label, ha='center', va='center', 
                 fontsize=9, color='white', fontweight='bold')
     
     # Relacionamentos
-    ax2.arrow(2.5, 7, 1, -1, head_width=0.15, head_length=0.15, 
-             fc=colors['arrow'], ec=colors['arrow'], linestyle='--')
-    ax2.arrow(5.5, 7, -1, -1, head_width=0.15, head_length=0.15, 
-             fc=colors['arrow'], ec=colors['arrow'], linestyle='--')
+    _add_arrow_collection(
+        ax2, [((2.5, 7), (3.5, 6)), ((5.5, 7), (4.5, 6))],
+        colors['arrow'], linewidths=1, alpha=1, linestyles='dashed',
+        head_length=0.15, head_width=0.15
+    )
     
     # ========================================
     # QUADRANTE 3: ML PIPELINE
     # ========================================
     
-    ax3.set_title("ML Pipeline Components", fontweight='bold', fontsize=14)
-    ax3.set_xlim(0, 10)
-    ax3.set_ylim(0, 10)
-    ax3.axis('off')
+    _blank_ax(ax3, "ML Pipeline Components")
     
     # Pipeline steps
     ml_steps = [
@@ -506,29 +652,26 @@ def create_detailed_component_diagram():
         (4, 2, "Prediction\nAPI", colors['interface'])
     ]
     
-    for x, y, label, color in ml_steps:
-        step_box = FancyBboxPatch(
-            (x, y), 2, 1.5,
-            boxstyle="round,pad=0.1",
-            facecolor=color,
-            alpha=0.8
-        )
-        ax3.add_patch(step_box)
+    _add_box_collection(
+        ax3, [(x, y, 2, 1.5) for x, y, _, _ in ml_steps],
+        [color for _, _, _, color in ml_steps]
+    )
+    
+    for x, y, label, _ in ml_steps:
         ax3.text(x+1, y+0.75, label, ha='center', va='center', 
                 fontsize=10, color='white', fontweight='bold')
     
     # Flow arrows
-    ax3.arrow(2.5, 8.75, 1, 0, head_width=0.1, head_length=0.2, fc=colors['arrow'], ec=colors['arrow'])
-    ax3.arrow(5.5, 8.75, 1, 0, head_width=0.1, head_length=0.2, fc=colors['arrow'], ec=colors['arrow'])
+    _add_arrow_collection(
+        ax3, [((2.5, 8.75), (3.5, 8.75)), ((5.5, 8.75), (6.5, 8.75))],
+        colors['arrow'], linewidths=1, alpha=1, head_length=0.2, head_width=0.1
+    )
     
     # ========================================
     # QUADRANTE 4: DASHBOARD INTERFACE
     # ========================================
     
-    ax4.set_title("Dashboard Components", fontweight='bold', fontsize=14)
-    ax4.set_xlim(0, 10)
-    ax4.set_ylim(0, 10)
-    ax4.axis('off')
+    _blank_ax(ax4, "Dashboard Components")
     
     # Dashboard elements
     dashboard_elements = [
@@ -539,23 +682,22 @@ def create_detailed_component_diagram():
         (3, 2, "Reports\n& Export", "PDF Reports\nCSV Export\nScheduled Reports")
     ]
     
+    _add_box_collection(
+        ax4, [(x, y, 3, 2) for x, y, _, _ in dashboard_elements],
+        [colors['interface']] * len(dashboard_elements)
+    )
+    
     for x, y, title, description in dashboard_elements:
-        element_box = FancyBboxPatch(
-            (x, y), 3, 2,
-            boxstyle="round,pad=0.1",
-            facecolor=colors['interface'],
-            alpha=0.8
-        )
-        ax4.add_patch(element_box)
         ax4.text(x+1.5, y+1.3, title, ha='center', va='center', 
                 fontsize=11, color='white', fontweight='bold')
         ax4.text(x+1.5, y+0.7, description, ha='center', va='center', 
                 fontsize=9, color='white')
     
-    plt.tight_layout()
-    plt.savefig("smart_maintenance_detailed_components.png", 
-                dpi=300, bbox_inches='tight', facecolor='white')
-    print("Diagrama detalhado salvo como: smart_maintenance_detailed_components.png")
+    fig.subplots_adjust(left=0.02, right=0.98, bottom=0.02, top=0.95, wspace=0.05, hspace=0.1)
+    plt.savefig(filename, 
+                dpi=DIAGRAM_CONFIG['dpi'], bbox_inches='tight', facecolor='white',
+                **_png_savefig_kwargs(filename))
+    print(f"Diagrama detalhado salvo como: {filename}")
 
 # ===========================================
 # EXECUÇÃO PRINCIPAL
@@ -572,7 +714,7 @@ def main():
     diagram = SmartMaintenanceArchitectureDiagram()
     diagram.create_main_architecture_diagram()
     diagram.add_timestamp_and_credits()
-    diagram.save_diagram("smart_maintenance_architecture.png")
+    diagram.save_diagram("smart_maintenance_architecture.svg")
     
     print()
     
@@ -583,8 +725,8 @@ def main():
     print()
     print("✅ Diagramas criados com sucesso!")
     print("📁 Arquivos gerados:")
-    print("   • smart_maintenance_architecture.png")
-    print("   • smart_maintenance_detailed_components.png")
+    print("   • smart_maintenance_architecture.svg")
+    print("   • smart_maintenance_detailed_components.svg")
     print()
     print("ℹ️  Use estes diagramas na documentação do projeto")
 
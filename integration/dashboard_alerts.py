@@ -17,28 +17,48 @@ Autor: Challenge Hermes Reply Team
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
-import altair as alt
 from datetime import datetime, timedelta
 import time
+import threading
+import importlib.util
+import io
 import json
+import os
+import tempfile
+from pathlib import Path
 import logging
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
+from concurrent.futures import Future, ThreadPoolExecutor
 import smtplib
 from email.mime.text import MimeText
 from email.mime.multipart import MimeMultipart
 
-# Database
-import cx_Oracle
-from sqlalchemy import create_engine
+# Numba (opcional): sem ele os kernels usam a implementação NumPy equivalente
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
-# ML Pipeline
-from ml_pipeline import SmartMaintenanceMLPipeline
+# orjson (opcional): figuras Plotly serializadas em C, com arrays NumPy sem conversão
+# elemento a elemento; sem ele o Plotly usa o json da stdlib
+if importlib.util.find_spec('orjson') is not None:
+    pio.json.config.default_engine = 'orjson'
+
+# streamlit-autorefresh (opcional): sem ele o auto-refresh volta a ser sleep + rerun
+try:
+    from streamlit_autorefresh import st_autorefresh
+    AUTOREFRESH_AVAILABLE = True
+except ImportError:
+    AUTOREFRESH_AVAILABLE = False
 
 # ===========================================
 # CONFIGURAÇÕES
@@ -66,6 +86,8 @@ ALERT_CONFIG = {
     'temperature_warning': 85.0,
     'pressure_min': 960.0,
     'pressure_max': 1040.0,
+    'pressure_warning_min': 970.0,
+    'pressure_warning_max': 1030.0,
     'humidity_critical': 80.0,
     'humidity_warning': 70.0,
     'vibration_critical': 10.0,
@@ -74,6 +96,54 @@ ALERT_CONFIG = {
     'ml_probability_warning': 0.6
 }
 
+# Thresholds de sensores em um único array, na ordem de THRESHOLD_KEYS,
+# para checagem vetorizada de todas as leituras de uma vez
+THRESHOLD_KEYS = (
+    'temperature_critical', 'temperature_warning',
+    'pressure_max', 'pressure_min',
+    'humidity_critical', 'humidity_warning',
+    'vibration_critical', 'vibration_warning'
+)
+THRESH = np.array([ALERT_CONFIG[key] for key in THRESHOLD_KEYS], dtype=np.float64)
+
+# Tipos compactos aplicados na fronteira SQL -> pandas
+MEASUREMENT_FLOAT_DTYPES = {
+    'VL_TEMPERATURA': 'float32',
+    'VL_PRESSAO': 'float32',
+    'VL_HUMIDADE': 'float32',
+    'VL_VIBRACAO': 'float32'
+}
+MEASUREMENT_CATEGORY_COLUMNS = ['ID_MAQUINA', 'TIPO_MAQUINA', 'LOCALIZACAO', 'FLAG_FALHA']
+
+# Níveis de status derivados, na ordem dos códigos usados em add_status_columns
+STATUS_LEVELS = ['NORMAL', 'WARNING', 'CRITICAL']
+
+# Linhas por bloco na leitura do banco
+SQL_CHUNKSIZE = 50_000
+
+# Pontos por equipamento em cada série dos gráficos (redução LTTB)
+LTTB_POINTS = 1000
+
+# Linhas por round-trip no driver (o padrão do cx_Oracle é 100)
+SQL_ARRAYSIZE = 10_000
+
+# Janelas de consulta (horas): medições brutas e agregados de KPI
+RAW_WINDOW_HOURS = 6
+KPI_WINDOW_HOURS = 24
+
+# Cópia local das medições recentes: semente da primeira carga após reiniciar o Streamlit
+RAW_CACHE_PATH = Path(tempfile.gettempdir()) / 'sm_cache.parquet'
+RAW_CACHE_MAX_AGE = 60  # segundos
+
+# Cores de status (KPIs) e de nível de risco (ML), na ordem de RISK_LEVELS
+STATUS_COLORS = {
+    'NORMAL': '#27ae60',
+    'WARNING': '#f39c12',
+    'CRITICAL': '#e74c3c'
+}
+RISK_LEVELS = ['LOW', 'MEDIUM', 'HIGH']
+RISK_COLORS = np.array(['#27ae60', '#f39c12', '#e74c3c'])
+
 # Email Configuration (para alertas)
 EMAIL_CONFIG = {
     'smtp_server': 'smtp.gmail.com',
@@ -83,6 +153,244 @@ EMAIL_CONFIG = {
     'recipients': ['admin@company.com', 'maintenance@company.com']
 }
 
+# ===========================================
+# KERNELS NUMÉRICOS
+# ===========================================
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True)
+    def _kpi_kernel(temp_sum, temp_count, n_readings, n_faults, id_codes, n_ids, window):
+        """Passada única sobre os agregados por minuto/equipamento (ordem cronológica):
+        média de temperatura, variação entre as primeiras e as últimas `window`
+        leituras (mais antigas menos mais recentes, como no frame DESC original),
+        equipamentos ativos, falhas e total de leituras"""
+        n = temp_sum.shape[0]
+        total_sum = 0.0
+        total_count = 0
+        total_faults = 0
+        total_readings = 0
+        seen = np.zeros(n_ids, dtype=np.uint8)
+        active = 0
+        
+        for i in range(n):
+            total_sum += temp_sum[i]
+            total_count += temp_count[i]
+            total_faults += n_faults[i]
+            total_readings += n_readings[i]
+            code = id_codes[i]
+            if code >= 0 and seen[code] == 0:
+                seen[code] = 1
+                active += 1
+        
+        # Blocos mais antigos até somar `window` leituras
+        head_sum = 0.0
+        head_count = 0
+        i = 0
+        while i < n and head_count < window:
+            head_sum += temp_sum[i]
+            head_count += temp_count[i]
+            i += 1
+        
+        # Blocos mais recentes até somar `window` leituras
+        tail_sum = 0.0
+        tail_count = 0
+        i = n - 1
+        while i >= 0 and tail_count < window:
+            tail_sum += temp_sum[i]
+            tail_count += temp_count[i]
+            i -= 1
+        
+        temp_avg = total_sum / total_count if total_count else np.nan
+        head_avg = head_sum / head_count if head_count else np.nan
+        tail_avg = tail_sum / tail_count if tail_count else np.nan
+        return temp_avg, head_avg - tail_avg, active, total_faults, total_readings
+    
+    @njit(nogil=True, cache=True)
+    def _scan_alerts(temp, press, hum, ts, id_codes, n_ids, thresholds):
+        """Linha mais recente por equipamento/tipo de alerta: (índices, tipos, severidades)"""
+        # Tipos: 0 = temperatura, 1 = pressão, 2 = umidade
+        best = np.full((n_ids, 3), -1, dtype=np.int64)
+        
+        for i in range(temp.shape[0]):
+            code = id_codes[i]
+            if code < 0:
+                continue
+            if temp[i] > thresholds[1]:
+                j = best[code, 0]
+                if j < 0 or ts[i] > ts[j]:
+                    best[code, 0] = i
+            if press[i] > thresholds[2] or press[i] < thresholds[3]:
+                j = best[code, 1]
+                if j < 0 or ts[i] > ts[j]:
+                    best[code, 1] = i
+            if hum[i] > thresholds[4]:
+                j = best[code, 2]
+                if j < 0 or ts[i] > ts[j]:
+                    best[code, 2] = i
+        
+        n_out = 0
+        for code in range(n_ids):
+            for kind in range(3):
+                if best[code, kind] >= 0:
+                    n_out += 1
+        
+        out_idx = np.empty(n_out, dtype=np.int64)
+        out_kind = np.empty(n_out, dtype=np.int32)
+        out_sev = np.empty(n_out, dtype=np.int32)
+        k = 0
+        for code in range(n_ids):
+            for kind in range(3):
+                i = best[code, kind]
+                if i >= 0:
+                    out_idx[k] = i
+                    out_kind[k] = kind
+                    # Severidade: 1 = CRITICAL, 0 = WARNING
+                    if kind == 0:
+                        out_sev[k] = 1 if temp[i] > thresholds[0] else 0
+                    else:
+                        out_sev[k] = 1 if kind == 1 else 0
+                    k += 1
+        return out_idx, out_kind, out_sev
+    
+    @njit(nogil=True, cache=True)
+    def _lttb_indices(x, y, n_out):
+        """Largest-Triangle-Three-Buckets: índices de `n_out` pontos que preservam o formato da série"""
+        n = x.shape[0]
+        if n_out >= n or n_out < 3:
+            return np.arange(n)
+        
+        out = np.empty(n_out, dtype=np.int64)
+        out[0] = 0
+        out[n_out - 1] = n - 1
+        every = (n - 2) / (n_out - 2)
+        a = 0
+        
+        for i in range(n_out - 2):
+            start = int(i * every) + 1
+            end = int((i + 1) * every) + 1
+            next_end = min(int((i + 2) * every) + 1, n)
+            
+            # Média do próximo bloco (terceiro vértice do triângulo)
+            avg_x = 0.0
+            avg_y = 0.0
+            for j in range(end, next_end):
+                avg_x += x[j]
+                avg_y += y[j]
+            count = next_end - end
+            if count > 0:
+                avg_x /= count
+                avg_y /= count
+            
+            # Ponto do bloco atual com maior área em relação ao último escolhido
+            max_area = -1.0
+            chosen = start
+            for j in range(start, end):
+                area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+                if area > max_area:
+                    max_area = area
+                    chosen = j
+            out[i + 1] = chosen
+            a = chosen
+        return out
+else:
+    def _kpi_kernel(temp_sum, temp_count, n_readings, n_faults, id_codes, n_ids, window):
+        """Versão NumPy do kernel de KPIs (usada quando o Numba não está instalado)"""
+        total_count = temp_count.sum()
+        
+        # Índice do bloco em que cada ponta acumula `window` leituras
+        head_end = np.searchsorted(np.cumsum(temp_count), window) + 1
+        tail_start = len(temp_count) - (np.searchsorted(np.cumsum(temp_count[::-1]), window) + 1)
+        tail_start = max(tail_start, 0)
+        
+        head_count = temp_count[:head_end].sum()
+        tail_count = temp_count[tail_start:].sum()
+        return (
+            temp_sum.sum() / total_count if total_count else np.nan,
+            (temp_sum[:head_end].sum() / head_count if head_count else np.nan)
+            - (temp_sum[tail_start:].sum() / tail_count if tail_count else np.nan),
+            np.unique(id_codes[id_codes >= 0]).size,
+            int(n_faults.sum()),
+            int(n_readings.sum())
+        )
+    
+    def _scan_alerts(temp, press, hum, ts, id_codes, n_ids, thresholds):
+        """Versão pandas/NumPy da varredura de alertas (usada sem o Numba)"""
+        masks = (
+            temp > thresholds[1],
+            (press > thresholds[2]) | (press < thresholds[3]),
+            hum > thresholds[4]
+        )
+        
+        out_idx, out_kind = [], []
+        for kind, mask in enumerate(masks):
+            rows = np.flatnonzero(mask & (id_codes >= 0))
+            subset = pd.DataFrame({'code': id_codes[rows], 'ts': ts[rows]}, index=rows)
+            latest = subset.groupby('code', sort=False)['ts'].idxmax().to_numpy(dtype=np.int64)
+            out_idx.append(latest)
+            out_kind.append(np.full(len(latest), kind, dtype=np.int32))
+        
+        out_idx = np.concatenate(out_idx)
+        out_kind = np.concatenate(out_kind)
+        out_sev = np.where(
+            out_kind == 0, temp[out_idx] > thresholds[0], out_kind == 1
+        ).astype(np.int32)
+        return out_idx, out_kind, out_sev
+    
+    def _lttb_indices(x, y, n_out):
+        """Versão NumPy do LTTB (laço por bloco, área vetorizada dentro do bloco)"""
+        n = x.shape[0]
+        if n_out >= n or n_out < 3:
+            return np.arange(n)
+        
+        out = np.empty(n_out, dtype=np.int64)
+        out[0] = 0
+        out[n_out - 1] = n - 1
+        every = (n - 2) / (n_out - 2)
+        a = 0
+        
+        for i in range(n_out - 2):
+            start = int(i * every) + 1
+            end = int((i + 1) * every) + 1
+            next_end = min(int((i + 2) * every) + 1, n)
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+            
+            area = np.abs(
+                (x[a] - avg_x) * (y[start:end] - y[a])
+                - (x[a] - x[start:end]) * (avg_y - y[a])
+            )
+            # np.argmax propaga NaN; tratar NaN como área nula
+            a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+            out[i + 1] = a
+        return out
+
+def frame_fingerprint(df: pd.DataFrame) -> Tuple:
+    """Chave barata para o cache: nº de linhas e timestamps das pontas do frame"""
+    if df.empty:
+        return (0,)
+    timestamps = df['dataHora_medicao']
+    return (len(df), timestamps.iat[0].value, timestamps.iat[-1].value)
+
+# Cache de dados derivados: invalida só quando chegam novas leituras
+FRAME_HASH_FUNCS = {pd.DataFrame: frame_fingerprint}
+
+@st.cache_resource
+def get_compute_pool() -> ThreadPoolExecutor:
+    """Pool de threads compartilhado entre reruns (KPIs, alertas e ML em paralelo)"""
+    return ThreadPoolExecutor(max_workers=3, thread_name_prefix='dashboard')
+
+@st.cache_resource
+def get_raw_cache_seed() -> Dict:
+    """Estado (por processo) da semente de partida a frio em RAW_CACHE_PATH"""
+    return {'pending': True, 'lock': threading.Lock()}
+
+def take_raw_cache_seed() -> bool:
+    """True só na primeira chamada do processo; as cargas seguintes vão ao Oracle"""
+    seed = get_raw_cache_seed()
+    with seed['lock']:
+        pending, seed['pending'] = seed['pending'], False
+    return pending
+
 # ===========================================
 # ESTRUTURAS DE DADOS
 # ===========================================
@@ -127,16 +435,29 @@ class SmartMaintenanceDashboard:
         # ML Pipeline
         self.ml_pipeline = None
         
+        # Gerador de números aleatórios das predições simuladas (semente fixa)
+        self.rng = np.random.default_rng(42)
+        
+        # Pool para os cálculos independentes sobre o mesmo DataFrame
+        self._pool = get_compute_pool()
+        
         # Cache para dados
-        if 'dashboard_cache' not in st.session_state:
-            st.session_state.dashboard_cache = {}
-            
         if 'alerts_cache' not in st.session_state:
             st.session_state.alerts_cache = []
             
         if 'last_refresh' not in st.session_state:
             st.session_state.last_refresh = datetime.now()
     
+    def submit(self, fn, *args) -> Future:
+        """Executar `fn` no pool, herdando o contexto do script Streamlit atual"""
+        ctx = get_script_run_ctx()
+        
+        def task():
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return fn(*args)
+        
+        return self._pool.submit(task)
+    
     def setup_logging(self):
         """Configurar logging"""
         logging.basicConfig(level=logging.INFO)
@@ -145,45 +466,82 @@ class SmartMaintenanceDashboard:
     def connect_database(_self):
         """Conectar ao banco de dados (cached)"""
         try:
+            # Import sob demanda: SQLAlchemy (e o driver cx_Oracle) só quando há conexão
+            from sqlalchemy import create_engine
+            
             # SQLAlchemy engine
             connection_string = f"oracle+cx_oracle://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['dsn']}"
-            engine = create_engine(connection_string)
+            engine = create_engine(
+                connection_string,
+                arraysize=SQL_ARRAYSIZE,
+                pool_pre_ping=True
+            )
             return engine
         except Exception as e:
             st.error(f"Erro ao conectar com banco: {str(e)}")
             return None
     
     @st.cache_data(ttl=60)  # Cache por 1 minuto
-    def load_real_time_data(_self) -> pd.DataFrame:
-        """Carregar dados em tempo real do banco"""
+    def load_raw_recent(_self) -> pd.DataFrame:
+        """Carregar medições brutas das últimas 6 horas (gráficos, alertas, detalhes)"""
         try:
+            # Partida a frio: usar o parquet local (uma vez por processo) se ainda
+            # estiver dentro da validade; recargas e "Atualizar Dados" vão ao Oracle
+            if (take_raw_cache_seed() and RAW_CACHE_PATH.exists()
+                    and time.time() - RAW_CACHE_PATH.stat().st_mtime < RAW_CACHE_MAX_AGE):
+                return pd.read_parquet(RAW_CACHE_PATH)
+            
+            from sqlalchemy import text
+            
             engine = _self.connect_database()
             if not engine:
                 return pd.DataFrame()
             
-            query = """
-            SELECT 
+            # Status de temperatura/pressão é derivado no cliente (add_status_columns);
+            # horizonte como bind parameter para o Oracle reaproveitar o plano
+            query = text("""
+            SELECT /*+ INDEX(m IDX_MEDICAO_TEMPO_COBERTURA) */
                 m.*,
                 e.tipo_maquina,
-                e.localizacao,
-                CASE 
-                    WHEN m.vl_temperatura > 95 THEN 'CRITICAL'
-                    WHEN m.vl_temperatura > 85 THEN 'WARNING' 
-                    ELSE 'NORMAL'
-                END as temp_status,
-                CASE 
-                    WHEN m.vl_pressao < 960 OR m.vl_pressao > 1040 THEN 'CRITICAL'
-                    WHEN m.vl_pressao < 970 OR m.vl_pressao > 1030 THEN 'WARNING'
-                    ELSE 'NORMAL'
-                END as pressure_status
+                e.localizacao
             FROM T_MEDICAO m
             INNER JOIN T_EQUIPAMENTO e ON m.id_maquina = e.id_maquina
-            WHERE m.dataHora_medicao >= SYSTIMESTAMP - INTERVAL '24' HOUR
+            WHERE m.dataHora_medicao >= :since
             ORDER BY m.dataHora_medicao DESC
-            """
+            """)
+            since = datetime.now() - timedelta(hours=RAW_WINDOW_HOURS)
             
-            df = pd.read_sql(query, engine)
-            df['dataHora_medicao'] = pd.to_datetime(df['DATAHORA_MEDICAO'])
+            # Leitura em blocos, com datas convertidas pelo próprio reader e
+            # floats reduzidos a float32 bloco a bloco
+            chunks = [
+                chunk.astype(MEASUREMENT_FLOAT_DTYPES)
+                for chunk in pd.read_sql(
+                    query, engine,
+                    params={'since': since},
+                    parse_dates=['DATAHORA_MEDICAO'],
+                    chunksize=SQL_CHUNKSIZE
+                )
+            ]
+            if not chunks:
+                return pd.DataFrame()
+            
+            df = pd.concat(chunks, ignore_index=True)
+            df = df.astype({column: 'category' for column in MEASUREMENT_CATEGORY_COLUMNS})
+            df['dataHora_medicao'] = df['DATAHORA_MEDICAO']
+            df = _self.add_status_columns(df)
+            
+            # Grava em arquivo temporário e troca atomicamente: outra sessão nunca
+            # lê um parquet pela metade
+            tmp_path = None
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=RAW_CACHE_PATH.parent, suffix='.parquet.tmp')
+                os.close(fd)
+                df.to_parquet(tmp_path, compression='zstd', index=False)
+                os.replace(tmp_path, RAW_CACHE_PATH)
+            except Exception as e:
+                _self.logger.warning(f"Não foi possível gravar cache local: {e}")
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
             
             return df
             
@@ -192,17 +550,96 @@ class SmartMaintenanceDashboard:
             return pd.DataFrame()
     
     @st.cache_data(ttl=300)  # Cache por 5 minutos
-    def calculate_kpis(_self, df: pd.DataFrame) -> List[KPI]:
-        """Calcular KPIs principais"""
-        if df.empty:
+    def load_kpi_aggregates(_self) -> pd.DataFrame:
+        """Carregar agregados por minuto/equipamento das últimas 24h, calculados no Oracle"""
+        try:
+            from sqlalchemy import text
+            
+            engine = _self.connect_database()
+            if not engine:
+                return pd.DataFrame()
+            
+            query = text("""
+            SELECT /*+ INDEX(m IDX_MEDICAO_TEMPO_COBERTURA) */
+                TRUNC(m.dataHora_medicao, 'MI') AS bucket,
+                m.id_maquina,
+                NVL(SUM(m.vl_temperatura), 0) AS temp_sum,
+                COUNT(m.vl_temperatura) AS temp_count,
+                COUNT(*) AS n_medicoes,
+                SUM(CASE WHEN m.flag_falha = 'S' THEN 1 ELSE 0 END) AS n_falhas
+            FROM T_MEDICAO m
+            WHERE m.dataHora_medicao >= :since
+            GROUP BY TRUNC(m.dataHora_medicao, 'MI'), m.id_maquina
+            ORDER BY bucket
+            """)
+            since = datetime.now() - timedelta(hours=KPI_WINDOW_HOURS)
+            
+            df = pd.read_sql(query, engine, params={'since': since}, parse_dates=['BUCKET'])
+            df['dataHora_medicao'] = df['BUCKET']
+            return df
+            
+        except Exception as e:
+            st.error(f"Erro ao carregar agregados: {str(e)}")
+            return pd.DataFrame()
+    
+    @st.cache_data(ttl=300, hash_funcs=FRAME_HASH_FUNCS)
+    def calculate_distributions(_self, df: pd.DataFrame) -> Tuple[pd.Series, pd.DataFrame]:
+        """Contagens de status de temperatura e de equipamentos por localização/tipo"""
+        # Colunas categóricas: descartar categorias sem ocorrência
+        temp_status_counts = df['TEMP_STATUS'].value_counts()
+        temp_status_counts = temp_status_counts[temp_status_counts > 0]
+        location_counts = (
+            df.groupby(['LOCALIZACAO', 'TIPO_MAQUINA'], observed=True)
+              .size()
+              .sort_values(ascending=False)
+              .reset_index(name='count')
+        )
+        return temp_status_counts, location_counts
+    
+    def add_status_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Derivar TEMP_STATUS e PRESSURE_STATUS com np.select a partir de ALERT_CONFIG"""
+        temp = df['VL_TEMPERATURA'].to_numpy()
+        press = df['VL_PRESSAO'].to_numpy()
+        
+        # Códigos inteiros (índices de STATUS_LEVELS) convertidos direto em category
+        temp_codes = np.select(
+            [temp > ALERT_CONFIG['temperature_critical'],
+             temp > ALERT_CONFIG['temperature_warning']],
+            [2, 1],
+            default=0
+        )
+        press_codes = np.select(
+            [(press < ALERT_CONFIG['pressure_min']) | (press > ALERT_CONFIG['pressure_max']),
+             (press < ALERT_CONFIG['pressure_warning_min']) | (press > ALERT_CONFIG['pressure_warning_max'])],
+            [2, 1],
+            default=0
+        )
+        df['TEMP_STATUS'] = pd.Categorical.from_codes(temp_codes, categories=STATUS_LEVELS)
+        df['PRESSURE_STATUS'] = pd.Categorical.from_codes(press_codes, categories=STATUS_LEVELS)
+        return df
+    
+    @st.cache_data(ttl=300, hash_funcs=FRAME_HASH_FUNCS)  # Cache por 5 minutos
+    def calculate_kpis(_self, agg: pd.DataFrame) -> List[KPI]:
+        """Calcular KPIs principais a partir dos agregados por minuto/equipamento"""
+        if agg.empty:
             return []
         
         kpis = []
         
         try:
+            # Todas as reduções em uma única passada (kernel Numba)
+            id_codes, id_uniques = pd.factorize(agg['ID_MAQUINA'])
+            temp_avg, temp_change, active_equipment, alerts_count, n_readings = _kpi_kernel(
+                agg['TEMP_SUM'].to_numpy(dtype=np.float64),
+                agg['TEMP_COUNT'].to_numpy(dtype=np.int64),
+                agg['N_MEDICOES'].to_numpy(dtype=np.int64),
+                agg['N_FALHAS'].to_numpy(dtype=np.int64),
+                id_codes,
+                len(id_uniques),
+                100
+            )
+            
             # KPI 1: Temperatura Média
-            temp_avg = df['VL_TEMPERATURA'].mean()
-            temp_change = df['VL_TEMPERATURA'].tail(100).mean() - df['VL_TEMPERATURA'].head(100).mean()
             temp_status = 'CRITICAL' if temp_avg > 95 else 'WARNING' if temp_avg > 85 else 'NORMAL'
             
             kpis.append(KPI(
@@ -215,7 +652,6 @@ class SmartMaintenanceDashboard:
             ))
             
             # KPI 2: Equipamentos Ativos
-            active_equipment = df['ID_MAQUINA'].nunique()
             total_equipment = 10  # Assumindo 10 equipamentos cadastrados
             active_pct = (active_equipment / total_equipment) * 100
             
@@ -229,8 +665,7 @@ class SmartMaintenanceDashboard:
             ))
             
             # KPI 3: Taxa de Alertas
-            alerts_count = len(df[df['FLAG_FALHA'] == 'S'])
-            alert_rate = (alerts_count / len(df)) * 100 if len(df) > 0 else 0
+            alert_rate = (alerts_count / n_readings) * 100 if n_readings > 0 else 0
             
             kpis.append(KPI(
                 name="Taxa de Alertas",
@@ -258,7 +693,15 @@ class SmartMaintenanceDashboard:
         
         return kpis
     
-    def generate_alerts(self, df: pd.DataFrame) -> List[Alert]:
+    @staticmethod
+    def category_codes(column: pd.Series) -> np.ndarray:
+        """Códigos inteiros da coluna (direto do dtype category, ou via factorize)"""
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return column.cat.codes.to_numpy(dtype=np.int64)
+        return pd.factorize(column)[0]
+    
+    @st.cache_data(ttl=60, hash_funcs=FRAME_HASH_FUNCS)
+    def generate_alerts(_self, df: pd.DataFrame) -> List[Alert]:
         """Gerar alertas baseado em thresholds e ML"""
         alerts = []
         
@@ -266,78 +709,70 @@ class SmartMaintenanceDashboard:
             return alerts
         
         try:
-            # Alertas baseados em threshold
-            for _, row in df.iterrows():
-                equipment_id = row['ID_MAQUINA']
-                timestamp = row['dataHora_medicao']
-                
-                # Alerta de temperatura
-                if row['VL_TEMPERATURA'] > ALERT_CONFIG['temperature_critical']:
-                    alerts.append(Alert(
-                        id=f"TEMP_{equipment_id}_{int(timestamp.timestamp())}",
-                        equipment_id=equipment_id,
-                        alert_type="TEMPERATURE_HIGH",
-                        severity="CRITICAL",
-                        message=f"Temperatura crítica: {row['VL_TEMPERATURA']:.1f}°C",
-                        timestamp=timestamp,
-                        value=row['VL_TEMPERATURA'],
-                        threshold=ALERT_CONFIG['temperature_critical'],
-                        status="ACTIVE",
-                        source="THRESHOLD"
-                    ))
-                elif row['VL_TEMPERATURA'] > ALERT_CONFIG['temperature_warning']:
-                    alerts.append(Alert(
-                        id=f"TEMP_{equipment_id}_{int(timestamp.timestamp())}",
-                        equipment_id=equipment_id,
-                        alert_type="TEMPERATURE_HIGH",
-                        severity="WARNING",
-                        message=f"Temperatura elevada: {row['VL_TEMPERATURA']:.1f}°C",
-                        timestamp=timestamp,
-                        value=row['VL_TEMPERATURA'],
-                        threshold=ALERT_CONFIG['temperature_warning'],
-                        status="ACTIVE",
-                        source="THRESHOLD"
-                    ))
-                
-                # Alerta de pressão
-                if (row['VL_PRESSAO'] < ALERT_CONFIG['pressure_min'] or 
-                    row['VL_PRESSAO'] > ALERT_CONFIG['pressure_max']):
-                    alerts.append(Alert(
-                        id=f"PRESS_{equipment_id}_{int(timestamp.timestamp())}",
-                        equipment_id=equipment_id,
-                        alert_type="PRESSURE_ABNORMAL",
-                        severity="CRITICAL",
-                        message=f"Pressão anormal: {row['VL_PRESSAO']:.1f} hPa",
-                        timestamp=timestamp,
-                        value=row['VL_PRESSAO'],
-                        threshold=ALERT_CONFIG['pressure_min'],
-                        status="ACTIVE",
-                        source="THRESHOLD"
-                    ))
+            # Varredura compilada sobre arrays: devolve apenas a leitura mais
+            # recente por equipamento/tipo; os objetos Alert são montados depois
+            # Códigos da coluna categórica (sem fatorar strings a cada chamada)
+            id_codes = _self.category_codes(df['ID_MAQUINA'])
+            timestamps = df['dataHora_medicao'].to_numpy()
+            temp = df['VL_TEMPERATURA'].to_numpy(dtype=np.float64)
+            press = df['VL_PRESSAO'].to_numpy(dtype=np.float64)
+            hum = df['VL_HUMIDADE'].to_numpy(dtype=np.float64)
+            
+            out_idx, out_kind, out_sev = _scan_alerts(
+                temp, press, hum,
+                timestamps.view(np.int64),
+                id_codes,
+                id_codes.max() + 1,
+                THRESH
+            )
+            
+            # Epoch, equipamento e timestamp só das linhas selecionadas, em lote
+            ts_epoch = timestamps[out_idx].astype('datetime64[s]').astype(np.int64)
+            equipment_ids = df['ID_MAQUINA'].take(out_idx).tolist()
+            alert_timestamps = df['dataHora_medicao'].take(out_idx).tolist()
+            
+            for i, kind, severity_code, equipment_id, ts, timestamp in zip(
+                out_idx, out_kind, out_sev, equipment_ids, ts_epoch.tolist(), alert_timestamps
+            ):
+                if kind == 0:
+                    # Alerta de temperatura
+                    value = temp[i]
+                    if severity_code:
+                        message = f"Temperatura crítica: {value:.1f}°C"
+                        threshold = ALERT_CONFIG['temperature_critical']
+                    else:
+                        message = f"Temperatura elevada: {value:.1f}°C"
+                        threshold = ALERT_CONFIG['temperature_warning']
+                    prefix, alert_type = "TEMP", "TEMPERATURE_HIGH"
+                elif kind == 1:
+                    # Alerta de pressão
+                    value = press[i]
+                    message = f"Pressão anormal: {value:.1f} hPa"
+                    threshold = ALERT_CONFIG['pressure_min']
+                    prefix, alert_type = "PRESS", "PRESSURE_ABNORMAL"
+                else:
+                    # Alerta de umidade
+                    value = hum[i]
+                    message = f"Umidade alta: {value:.1f}%"
+                    threshold = ALERT_CONFIG['humidity_critical']
+                    prefix, alert_type = "HUM", "HUMIDITY_HIGH"
                 
-                # Alerta de umidade
-                if row['VL_HUMIDADE'] > ALERT_CONFIG['humidity_critical']:
-                    alerts.append(Alert(
-                        id=f"HUM_{equipment_id}_{int(timestamp.timestamp())}",
-                        equipment_id=equipment_id,
-                        alert_type="HUMIDITY_HIGH",
-                        severity="WARNING",
-                        message=f"Umidade alta: {row['VL_HUMIDADE']:.1f}%",
-                        timestamp=timestamp,
-                        value=row['VL_HUMIDADE'],
-                        threshold=ALERT_CONFIG['humidity_critical'],
-                        status="ACTIVE",
-                        source="THRESHOLD"
-                    ))
-            
-            # Manter apenas alertas únicos (último por equipamento/tipo)
-            unique_alerts = {}
-            for alert in alerts:
-                key = f"{alert.equipment_id}_{alert.alert_type}"
-                if key not in unique_alerts or alert.timestamp > unique_alerts[key].timestamp:
-                    unique_alerts[key] = alert
-            
-            return list(unique_alerts.values())
+                alerts.append(Alert(
+                    id=f"{prefix}_{equipment_id}_{ts}",
+                    equipment_id=equipment_id,
+                    alert_type=alert_type,
+                    severity="CRITICAL" if severity_code else "WARNING",
+                    message=message,
+                    timestamp=timestamp,
+                    value=value,
+                    threshold=threshold,
+                    status="ACTIVE",
+                    source="THRESHOLD"
+                ))
+            
+            # Mais recentes primeiro
+            alerts.sort(key=lambda alert: alert.timestamp, reverse=True)
+            return alerts
             
         except Exception as e:
             st.error(f"Erro ao gerar alertas: {str(e)}")
@@ -383,6 +818,15 @@ class SmartMaintenanceDashboard:
             self.logger.error(f"Erro ao enviar email: {str(e)}")
             return False
     
+    @st.cache_data(ttl=60, hash_funcs=FRAME_HASH_FUNCS)
+    def export_bytes(_self, df: pd.DataFrame, fmt: str) -> bytes:
+        """Serializar o frame para download (parquet colunar ou CSV), reaproveitado entre reruns"""
+        if fmt == 'parquet':
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, compression='zstd', index=False)
+            return buffer.getvalue()
+        return df.to_csv(index=False).encode('utf-8')
+    
     def render_header(self):
         """Render cabeçalho do dashboard"""
         st.markdown("""
@@ -397,36 +841,162 @@ class SmartMaintenanceDashboard:
         if not kpis:
             return
         
-        cols = st.columns(len(kpis))
-        
-        for i, kpi in enumerate(kpis):
-            with cols[i]:
-                # Cor baseada no status
-                color_map = {
-                    'NORMAL': '#27ae60',
-                    'WARNING': '#f39c12', 
-                    'CRITICAL': '#e74c3c'
-                }
-                color = color_map.get(kpi.status, '#7f8c8d')
-                
-                # Card HTML
-                card_html = f"""
-                <div style='
-                    background: white; 
-                    padding: 1.5rem; 
-                    border-radius: 10px; 
-                    border-left: 4px solid {color};
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    height: 120px;
-                '>
-                    <h3 style='color: #2c3e50; font-size: 0.9rem; margin: 0;'>{kpi.name}</h3>
-                    <h2 style='color: {color}; margin: 0.5rem 0;'>{kpi.value:.1f} {kpi.unit}</h2>
-                    <p style='color: #7f8c8d; font-size: 0.8rem; margin: 0;'>
-                        Status: <strong style='color: {color};'>{kpi.status}</strong>
-                    </p>
-                </div>
-                """
-                st.markdown(card_html, unsafe_allow_html=True)
+        # Todos os cards em um único bloco HTML (um só elemento por rerun)
+        cards = []
+        for kpi in kpis:
+            # Cor baseada no status
+            color = STATUS_COLORS.get(kpi.status, '#7f8c8d')
+            
+            cards.append(
+                f"<div style='flex: 1; background: white; padding: 1.5rem; border-radius: 10px; "
+                f"border-left: 4px solid {color}; box-shadow: 0 2px 4px rgba(0,0,0,0.1); height: 120px;'>"
+                f"<h3 style='color: #2c3e50; font-size: 0.9rem; margin: 0;'>{kpi.name}</h3>"
+                f"<h2 style='color: {color}; margin: 0.5rem 0;'>{kpi.value:.1f} {kpi.unit}</h2>"
+                f"<p style='color: #7f8c8d; font-size: 0.8rem; margin: 0;'>"
+                f"Status: <strong style='color: {color};'>{kpi.status}</strong></p>"
+                f"</div>"
+            )
+        
+        st.markdown(
+            "<div style='display: flex; gap: 1rem;'>" + "".join(cards) + "</div>",
+            unsafe_allow_html=True
+        )
+    
+    @st.cache_data(ttl=60, hash_funcs=FRAME_HASH_FUNCS)
+    def downsampled_series(_self, df: pd.DataFrame, columns: Tuple[str, ...],
+                           n_out: int = LTTB_POINTS) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Séries (tempo, valor, equipamento) reduzidas com LTTB por equipamento, com um gap (NaN/NaT) entre equipamentos"""
+        ordered = df.sort_values(['ID_MAQUINA', 'dataHora_medicao'])
+        timestamps = ordered['dataHora_medicao'].to_numpy()
+        ts_ns = timestamps.view(np.int64)
+        ids = ordered['ID_MAQUINA'].to_numpy().astype(object)
+        bounds = np.r_[0, ordered.groupby('ID_MAQUINA', observed=True).size().cumsum().to_numpy()]
+        
+        series = {}
+        for column in columns:
+            values = ordered[column].to_numpy(dtype=np.float64)
+            kept = [
+                start + _lttb_indices(
+                    (ts_ns[start:end] - ts_ns[start]).astype(np.float64), values[start:end], n_out
+                )
+                for start, end in zip(bounds[:-1], bounds[1:])
+            ]
+            gaps = np.cumsum([len(k) for k in kept])[:-1]
+            keep = np.concatenate(kept)
+            series[column] = (
+                np.insert(timestamps[keep], gaps, np.datetime64('NaT')),
+                np.insert(values[keep], gaps, np.nan),
+                np.insert(ids[keep], gaps, None)
+            )
+        return series
+    
+    # Figuras cacheadas como recurso (sem cópia/pickle a cada rerun): st.plotly_chart só as lê
+    @st.cache_resource(ttl=60, hash_funcs=FRAME_HASH_FUNCS)
+    def build_temperature_figure(_self, df_recent: pd.DataFrame) -> go.Figure:
+        """Figura de evolução da temperatura por equipamento"""
+        temp = _self.downsampled_series(df_recent, ('VL_TEMPERATURA',))['VL_TEMPERATURA']
+        
+        fig_temp = go.Figure()
+        
+        # Um único trace WebGL; equipamentos separados por gaps (NaN)
+        fig_temp.add_trace(go.Scattergl(
+            x=temp[0],
+            y=temp[1],
+            text=temp[2],
+            mode='lines+markers',
+            name="Temperatura",
+            line=dict(width=2),
+            marker=dict(size=4),
+            hovertemplate="%{text}: %{y:.1f}°C<extra></extra>"
+        ))
+        
+        # Linha de threshold crítico
+        fig_temp.add_hline(
+            y=ALERT_CONFIG['temperature_critical'],
+            line_dash="dash",
+            line_color="red",
+            annotation_text="Crítico (95°C)"
+        )
+        
+        fig_temp.update_layout(
+            title="Evolução da Temperatura",
+            xaxis_title="Tempo",
+            yaxis_title="Temperatura (°C)",
+            hovermode='x unified',
+            height=400
+        )
+        return fig_temp
+    
+    @st.cache_resource(ttl=60, hash_funcs=FRAME_HASH_FUNCS)
+    def build_pressure_vibration_figure(_self, df_recent: pd.DataFrame) -> go.Figure:
+        """Figura com subplots de pressão e vibração"""
+        series = _self.downsampled_series(df_recent, ('VL_PRESSAO', 'VL_VIBRACAO'))
+        
+        # Subplot para pressão e vibração
+        fig_multi = make_subplots(
+            rows=2, cols=1,
+            subplot_titles=('Pressão (hPa)', 'Vibração (m/s²)'),
+            vertical_spacing=0.1
+        )
+        
+        # Pressão
+        fig_multi.add_trace(
+            go.Scattergl(
+                x=series['VL_PRESSAO'][0],
+                y=series['VL_PRESSAO'][1],
+                text=series['VL_PRESSAO'][2],
+                mode='lines',
+                name="Pressão",
+                showlegend=False,
+                hovertemplate="%{text}: %{y:.1f} hPa<extra></extra>"
+            ),
+            row=1, col=1
+        )
+        
+        # Vibração
+        fig_multi.add_trace(
+            go.Scattergl(
+                x=series['VL_VIBRACAO'][0],
+                y=series['VL_VIBRACAO'][1],
+                text=series['VL_VIBRACAO'][2],
+                mode='lines',
+                name="Vibração",
+                showlegend=False,
+                hovertemplate="%{text}: %{y:.2f} m/s²<extra></extra>"
+            ),
+            row=2, col=1
+        )
+        
+        fig_multi.update_layout(height=400)
+        return fig_multi
+    
+    @st.cache_resource(ttl=60, hash_funcs=FRAME_HASH_FUNCS)
+    def build_distribution_figures(_self, df: pd.DataFrame) -> Tuple[go.Figure, go.Figure]:
+        """Figuras de distribuição de status (pizza) e de equipamentos por localização (barras)"""
+        temp_status_counts, location_counts = _self.calculate_distributions(df)
+        
+        # Pie chart de status de temperatura
+        fig_pie = go.Figure(data=[go.Pie(
+            labels=temp_status_counts.index,
+            values=temp_status_counts.values,
+            hole=.3,
+            marker_colors=['#27ae60', '#f39c12', '#e74c3c']
+        )])
+        
+        fig_pie.update_layout(
+            title="Distribuição Status Temperatura",
+            annotations=[dict(text='Status', x=0.5, y=0.5, font_size=20, showarrow=False)]
+        )
+        
+        # Bar chart de equipamentos por localização
+        fig_bar = px.bar(
+            location_counts, 
+            x='LOCALIZACAO', 
+            y='count',
+            color='TIPO_MAQUINA',
+            title="Equipamentos por Localização"
+        )
+        return fig_pie, fig_bar
     
     def render_real_time_charts(self, df: pd.DataFrame):
         """Render gráficos em tempo real"""
@@ -436,7 +1006,7 @@ class SmartMaintenanceDashboard:
         
         # Filtrar dados das últimas 6 horas para melhor visualização
         cutoff_time = datetime.now() - timedelta(hours=6)
-        df_recent = df[df['dataHora_medicao'] > cutoff_time].copy()
+        df_recent = df.loc[df['dataHora_medicao'] > cutoff_time]  # somente leitura: sem cópia
         
         if df_recent.empty:
             df_recent = df.tail(100)  # Últimas 100 medições se não há dados recentes
@@ -446,112 +1016,23 @@ class SmartMaintenanceDashboard:
         
         with col1:
             st.subheader("📊 Temperatura por Equipamento")
-            
-            fig_temp = go.Figure()
-            
-            for equipment in df_recent['ID_MAQUINA'].unique():
-                eq_data = df_recent[df_recent['ID_MAQUINA'] == equipment]
-                fig_temp.add_trace(go.Scatter(
-                    x=eq_data['dataHora_medicao'],
-                    y=eq_data['VL_TEMPERATURA'],
-                    mode='lines+markers',
-                    name=equipment,
-                    line=dict(width=2),
-                    marker=dict(size=4)
-                ))
-            
-            # Linha de threshold crítico
-            fig_temp.add_hline(
-                y=ALERT_CONFIG['temperature_critical'],
-                line_dash="dash",
-                line_color="red",
-                annotation_text="Crítico (95°C)"
-            )
-            
-            fig_temp.update_layout(
-                title="Evolução da Temperatura",
-                xaxis_title="Tempo",
-                yaxis_title="Temperatura (°C)",
-                hovermode='x unified',
-                height=400
-            )
-            
-            st.plotly_chart(fig_temp, use_container_width=True)
+            st.plotly_chart(self.build_temperature_figure(df_recent), use_container_width=True)
         
         with col2:
             st.subheader("💨 Pressão e Vibração")
-            
-            # Subplot para pressão e vibração
-            fig_multi = make_subplots(
-                rows=2, cols=1,
-                subplot_titles=('Pressão (hPa)', 'Vibração (m/s²)'),
-                vertical_spacing=0.1
-            )
-            
-            # Pressão
-            for equipment in df_recent['ID_MAQUINA'].unique():
-                eq_data = df_recent[df_recent['ID_MAQUINA'] == equipment]
-                fig_multi.add_trace(
-                    go.Scatter(
-                        x=eq_data['dataHora_medicao'],
-                        y=eq_data['VL_PRESSAO'],
-                        mode='lines',
-                        name=f"{equipment} - Pressão",
-                        showlegend=False
-                    ),
-                    row=1, col=1
-                )
-                
-                # Vibração
-                fig_multi.add_trace(
-                    go.Scatter(
-                        x=eq_data['dataHora_medicao'],
-                        y=eq_data['VL_VIBRACAO'],
-                        mode='lines',
-                        name=f"{equipment} - Vibração",
-                        showlegend=False
-                    ),
-                    row=2, col=1
-                )
-            
-            fig_multi.update_layout(height=400)
-            st.plotly_chart(fig_multi, use_container_width=True)
+            st.plotly_chart(self.build_pressure_vibration_figure(df_recent), use_container_width=True)
         
         # Gráfico 3: Distribuição de status
         st.subheader("📈 Status dos Equipamentos")
         
+        fig_pie, fig_bar = self.build_distribution_figures(df)
+        
         col3, col4 = st.columns(2)
         
         with col3:
-            # Pie chart de status de temperatura
-            temp_status_counts = df['TEMP_STATUS'].value_counts()
-            
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=temp_status_counts.index,
-                values=temp_status_counts.values,
-                hole=.3,
-                marker_colors=['#27ae60', '#f39c12', '#e74c3c']
-            )])
-            
-            fig_pie.update_layout(
-                title="Distribuição Status Temperatura",
-                annotations=[dict(text='Status', x=0.5, y=0.5, font_size=20, showarrow=False)]
-            )
-            
             st.plotly_chart(fig_pie, use_container_width=True)
         
         with col4:
-            # Bar chart de equipamentos por localização
-            location_counts = df.groupby(['LOCALIZACAO', 'TIPO_MAQUINA']).size().reset_index(name='count')
-            
-            fig_bar = px.bar(
-                location_counts, 
-                x='LOCALIZACAO', 
-                y='count',
-                color='TIPO_MAQUINA',
-                title="Equipamentos por Localização"
-            )
-            
             st.plotly_chart(fig_bar, use_container_width=True)
     
     def render_alerts_panel(self, alerts: List[Alert]):
@@ -573,39 +1054,53 @@ class SmartMaintenanceDashboard:
         if severity_filter != "Todos":
             filtered_alerts = [a for a in alerts if a.severity == severity_filter]
         
-        # Mostrar alertas em cards
-        for alert in filtered_alerts[:10]:  # Mostrar apenas os 10 mais recentes
-            severity_color = {
-                'CRITICAL': '#e74c3c',
-                'WARNING': '#f39c12',
-                'LOW': '#3498db'
-            }.get(alert.severity, '#7f8c8d')
-            
-            with st.expander(
-                f"🔥 {alert.equipment_id} - {alert.alert_type} - {alert.severity}",
-                expanded=(alert.severity == "CRITICAL")
-            ):
-                col1, col2, col3 = st.columns([2, 1, 1])
-                
-                with col1:
-                    st.write(f"**Mensagem:** {alert.message}")
-                    st.write(f"**Timestamp:** {alert.timestamp}")
-                    st.write(f"**Fonte:** {alert.source}")
-                
-                with col2:
-                    st.metric("Valor Atual", f"{alert.value:.2f}")
-                    st.metric("Threshold", f"{alert.threshold:.2f}")
-                
-                with col3:
-                    if st.button(f"Reconhecer", key=f"ack_{alert.id}"):
-                        st.success("Alerta reconhecido!")
-                        # Aqui seria implementada a lógica para atualizar status no banco
-                    
-                    if st.button(f"Enviar Email", key=f"email_{alert.id}"):
-                        if self.send_alert_email(alert):
-                            st.success("Email enviado!")
-                        else:
-                            st.error("Falha no envio")
+        # Tabela única com coluna de ação (em vez de dois botões por alerta)
+        top_alerts = filtered_alerts[:10]  # Mostrar apenas os 10 mais recentes
+        alerts_df = pd.DataFrame({
+            'equipment_id': [a.equipment_id for a in top_alerts],
+            'alert_type': [a.alert_type for a in top_alerts],
+            'severity': [a.severity for a in top_alerts],
+            'value': [a.value for a in top_alerts],
+            'threshold': [a.threshold for a in top_alerts],
+            'message': [a.message for a in top_alerts],
+            'timestamp': [a.timestamp for a in top_alerts],
+            'action': ''
+        })
+        
+        edited = st.data_editor(
+            alerts_df,
+            column_config={
+                'action': st.column_config.SelectboxColumn(
+                    "Ação", options=['', 'ACK', 'EMAIL']
+                ),
+                'value': st.column_config.NumberColumn("Valor Atual", format="%.2f"),
+                'threshold': st.column_config.NumberColumn("Threshold", format="%.2f")
+            },
+            disabled=[c for c in alerts_df.columns if c != 'action'],
+            hide_index=True,
+            use_container_width=True,
+            key='alerts_editor'
+        )
+        
+        # Processar apenas ações novas (cada alerta/ação uma única vez)
+        handled = st.session_state.setdefault('handled_alert_actions', set())
+        # Células limpas (None) ou vazias não disparam nenhuma ação
+        actions = edited['action'].to_numpy()
+        for row in np.flatnonzero(np.isin(actions, ['ACK', 'EMAIL'])):
+            alert = top_alerts[row]
+            action = actions[row]
+            if (alert.id, action) in handled:
+                continue
+            handled.add((alert.id, action))
+            
+            if action == 'ACK':
+                st.success(f"Alerta {alert.equipment_id} reconhecido!")
+                # Aqui seria implementada a lógica para atualizar status no banco
+            elif action == 'EMAIL':
+                if self.send_alert_email(alert):
+                    st.success(f"Email enviado ({alert.equipment_id})!")
+                else:
+                    st.error(f"Falha no envio ({alert.equipment_id})")
     
     def render_equipment_details(self, df: pd.DataFrame):
         """Render detalhes dos equipamentos"""
@@ -640,7 +1135,7 @@ class SmartMaintenanceDashboard:
                 
                 with col2:
                     # Histórico detalhado
-                    st.write("**Histórico das últimas 24h**")
+                    st.write("**Histórico das últimas 6h**")
                     
                     # Tabela com dados recentes
                     display_data = eq_data[['dataHora_medicao', 'VL_TEMPERATURA', 'VL_PRESSAO', 
@@ -655,8 +1150,43 @@ class SmartMaintenanceDashboard:
                         height=300
                     )
     
-    def render_ml_insights(self, df: pd.DataFrame):
-        """Render insights do modelo ML"""
+    @st.cache_data(ttl=60, hash_funcs=FRAME_HASH_FUNCS)
+    def compute_ml_predictions(_self, df: pd.DataFrame) -> pd.DataFrame:
+        """Predições simuladas de risco por equipamento (parte pura, cacheada)"""
+        # Última leitura de cada equipamento, obtida em um único groupby
+        latest = (
+            df.sort_values('dataHora_medicao')
+              .groupby('ID_MAQUINA', sort=False, observed=True)
+              .tail(1)
+        )
+        
+        # Simular probabilidade de falha baseada nos dados (vetorizado)
+        temp = latest['VL_TEMPERATURA'].to_numpy()
+        press = latest['VL_PRESSAO'].to_numpy()
+        risk = (
+            0.3 * (temp > 90)
+            + 0.2 * ((press < 970) | (press > 1030))
+            + 0.1 * (latest['VL_HUMIDADE'].to_numpy() > 75)
+            + 0.2 * (latest['VL_VIBRACAO'].to_numpy() > 5)
+        )
+        
+        # Adicionar ruído aleatório e limitar entre 0 e 1
+        risk += _self.rng.normal(0, 0.1, len(risk))
+        np.clip(risk, 0, 1, out=risk)
+        
+        return pd.DataFrame({
+            'equipment': latest['ID_MAQUINA'].to_numpy(),
+            'risk_score': risk,
+            'risk_level': np.select([risk > 0.6, risk > 0.3], ['HIGH', 'MEDIUM'], default='LOW'),
+            'prediction': np.select(
+                [risk > 0.6, risk > 0.3],
+                ['MANUTENÇÃO NECESSÁRIA', 'MONITORAR'],
+                default='NORMAL'
+            )
+        }).sort_values('risk_score', ascending=False)
+    
+    def render_ml_insights(self, df: pd.DataFrame, pred_df: Optional[pd.DataFrame] = None):
+        """Render insights do modelo ML (predições já calculadas podem ser passadas)"""
         st.subheader("🤖 Insights de Machine Learning")
         
         if df.empty:
@@ -665,70 +1195,36 @@ class SmartMaintenanceDashboard:
         
         try:
             # Simular predições ML (em produção, usar modelo real)
-            np.random.seed(42)
-            equipment_list = df['ID_MAQUINA'].unique()
-            
-            ml_predictions = []
-            for eq in equipment_list:
-                eq_data = df[df['ID_MAQUINA'] == eq].tail(1)
-                if not eq_data.empty:
-                    latest = eq_data.iloc[0]
-                    
-                    # Simular probabilidade de falha baseada nos dados
-                    risk_score = 0
-                    if latest['VL_TEMPERATURA'] > 90:
-                        risk_score += 0.3
-                    if latest['VL_PRESSAO'] < 970 or latest['VL_PRESSAO'] > 1030:
-                        risk_score += 0.2
-                    if latest['VL_HUMIDADE'] > 75:
-                        risk_score += 0.1
-                    if latest['VL_VIBRACAO'] > 5:
-                        risk_score += 0.2
-                    
-                    # Adicionar ruído aleatório
-                    risk_score += np.random.normal(0, 0.1)
-                    risk_score = max(0, min(1, risk_score))  # Clamp entre 0 e 1
-                    
-                    ml_predictions.append({
-                        'equipment': eq,
-                        'risk_score': risk_score,
-                        'risk_level': 'HIGH' if risk_score > 0.6 else 'MEDIUM' if risk_score > 0.3 else 'LOW',
-                        'prediction': 'MANUTENÇÃO NECESSÁRIA' if risk_score > 0.6 else 'MONITORAR' if risk_score > 0.3 else 'NORMAL'
-                    })
-            
-            if ml_predictions:
-                # Ordenar por risk score
-                ml_predictions.sort(key=lambda x: x['risk_score'], reverse=True)
-                
+            if pred_df is None:
+                pred_df = self.compute_ml_predictions(df)
+            
+            if not pred_df.empty:
                 col1, col2 = st.columns([1, 1])
                 
                 with col1:
                     st.write("**Ranking de Risco por Equipamento**")
                     
-                    for pred in ml_predictions:
-                        risk_color = '#e74c3c' if pred['risk_level'] == 'HIGH' else '#f39c12' if pred['risk_level'] == 'MEDIUM' else '#27ae60'
-                        
-                        st.markdown(f"""
-                        <div style='
-                            background: white; 
-                            padding: 1rem; 
-                            margin: 0.5rem 0;
-                            border-radius: 5px;
-                            border-left: 4px solid {risk_color};
-                            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                        '>
-                            <strong>{pred['equipment']}</strong><br>
-                            Risco: <span style='color: {risk_color};'><strong>{pred['risk_score']:.1%}</strong></span><br>
-                            Ação: {pred['prediction']}
-                        </div>
-                        """, unsafe_allow_html=True)
+                    # Cores via código categórico do nível de risco (lookup em array)
+                    level_codes = pd.Categorical(pred_df['risk_level'], categories=RISK_LEVELS).codes
+                    risk_colors = RISK_COLORS[level_codes]
+                    
+                    rows = [
+                        f"<div style='background: white; padding: 1rem; margin: 0.5rem 0; border-radius: 5px; "
+                        f"border-left: 4px solid {risk_color}; box-shadow: 0 1px 3px rgba(0,0,0,0.1);'>"
+                        f"<strong>{equipment}</strong><br>"
+                        f"Risco: <span style='color: {risk_color};'><strong>{risk_score:.1%}</strong></span><br>"
+                        f"Ação: {prediction}"
+                        f"</div>"
+                        for equipment, risk_score, prediction, risk_color in zip(
+                            pred_df['equipment'], pred_df['risk_score'], pred_df['prediction'], risk_colors
+                        )
+                    ]
+                    st.markdown("".join(rows), unsafe_allow_html=True)
                 
                 with col2:
                     st.write("**Distribuição de Risco**")
                     
                     # Gráfico de barras horizontal
-                    pred_df = pd.DataFrame(ml_predictions)
-                    
                     fig_risk = px.bar(
                         pred_df.sort_values('risk_score'),
                         y='equipment',
@@ -766,8 +1262,12 @@ class SmartMaintenanceDashboard:
             
             # Controle de auto-refresh
             auto_refresh = st.checkbox("Auto-refresh (30s)", value=True)
+            if auto_refresh and AUTOREFRESH_AVAILABLE:
+                # Refresh agendado no navegador: nada bloqueia a thread do script
+                st_autorefresh(interval=30_000, key='dash_refresh')
             
             if st.button("🔄 Atualizar Dados"):
+                take_raw_cache_seed()  # descartar a semente local: dados frescos do Oracle
                 st.cache_data.clear()
                 st.rerun()
             
@@ -780,20 +1280,20 @@ class SmartMaintenanceDashboard:
             )
             
             # Filtros de equipamento
-            if 'dashboard_cache' in st.session_state and st.session_state.dashboard_cache:
-                df = st.session_state.dashboard_cache
-                if not df.empty:
-                    selected_locations = st.multiselect(
-                        "Localizações:",
-                        options=df['LOCALIZACAO'].unique(),
-                        default=df['LOCALIZACAO'].unique()
-                    )
-                    
-                    selected_types = st.multiselect(
-                        "Tipos de Equipamento:",
-                        options=df['TIPO_MAQUINA'].unique(),
-                        default=df['TIPO_MAQUINA'].unique()
-                    )
+            # (load_raw_recent é memoizado: aqui é só uma consulta ao cache)
+            df = self.load_raw_recent()
+            if not df.empty:
+                selected_locations = st.multiselect(
+                    "Localizações:",
+                    options=df['LOCALIZACAO'].unique(),
+                    default=df['LOCALIZACAO'].unique()
+                )
+                
+                selected_types = st.multiselect(
+                    "Tipos de Equipamento:",
+                    options=df['TIPO_MAQUINA'].unique(),
+                    default=df['TIPO_MAQUINA'].unique()
+                )
             
             # Status do sistema
             st.subheader("Status do Sistema")
@@ -801,70 +1301,73 @@ class SmartMaintenanceDashboard:
             st.info("🔵 MQTT: Simulado")
             st.warning("🟡 ML Model: Simulado")
         
-        # Auto-refresh
-        if auto_refresh:
-            time.sleep(0.1)  # Pequena pausa
-            placeholder = st.empty()
+        # Carregar dados (brutos recentes + agregados de KPI do banco)
+        df = self.load_raw_recent()
+        
+        if not df.empty:
+            # Filtrar dados se necessário
+            # (implementar filtros baseados na sidebar)
+            
+            # KPIs, alertas e ML são independentes (só leem df): calcular em paralelo
+            f_kpi = self.submit(lambda: self.calculate_kpis(self.load_kpi_aggregates()))
+            f_alerts = self.submit(self.generate_alerts, df)
+            f_ml = self.submit(self.compute_ml_predictions, df)
+            
+            # KPIs
+            self.render_kpi_cards(f_kpi.result())
+            
+            # Gráficos em tempo real
+            self.render_real_time_charts(df)
+            
+            # Alertas
+            alerts = f_alerts.result()
+            st.session_state.alerts_cache = alerts
+            self.render_alerts_panel(alerts)
             
-            with placeholder.container():
-                # Carregar dados
-                df = self.load_real_time_data()
-                st.session_state.dashboard_cache = df
+            # Abas para diferentes visualizações
+            tab1, tab2, tab3 = st.tabs(["📋 Equipamentos", "🤖 ML Insights", "📊 Relatórios"])
+            
+            with tab1:
+                self.render_equipment_details(df)
+            
+            with tab2:
+                self.render_ml_insights(df, f_ml.result())
+            
+            with tab3:
+                st.subheader("📈 Relatórios Executivos")
+                st.info("Funcionalidade em desenvolvimento")
                 
-                if not df.empty:
-                    # Filtrar dados se necessário
-                    # (implementar filtros baseados na sidebar)
-                    
-                    # KPIs
-                    kpis = self.calculate_kpis(df)
-                    self.render_kpi_cards(kpis)
-                    
-                    # Gráficos em tempo real
-                    self.render_real_time_charts(df)
-                    
-                    # Alertas
-                    alerts = self.generate_alerts(df)
-                    st.session_state.alerts_cache = alerts
-                    self.render_alerts_panel(alerts)
-                    
-                    # Abas para diferentes visualizações
-                    tab1, tab2, tab3 = st.tabs(["📋 Equipamentos", "🤖 ML Insights", "📊 Relatórios"])
-                    
-                    with tab1:
-                        self.render_equipment_details(df)
-                    
-                    with tab2:
-                        self.render_ml_insights(df)
-                    
-                    with tab3:
-                        st.subheader("📈 Relatórios Executivos")
-                        st.info("Funcionalidade em desenvolvimento")
-                        
-                        # Placeholder para relatórios
-                        if st.button("Gerar Relatório Semanal"):
-                            st.success("Relatório gerado! (simulado)")
-                        
-                        if st.button("Exportar Dados CSV"):
-                            csv = df.to_csv(index=False)
-                            st.download_button(
-                                label="Download CSV",
-                                data=csv,
-                                file_name=f"smart_maintenance_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                                mime="text/csv"
-                            )
+                # Placeholder para relatórios
+                if st.button("Gerar Relatório Semanal"):
+                    st.success("Relatório gerado! (simulado)")
                 
-                else:
-                    st.warning("⚠️ Nenhum dado disponível. Verifique a conexão com o banco de dados.")
-                    
-                    # Dados simulados para demonstração
-                    if st.button("Usar Dados Simulados"):
-                        st.info("Gerando dados simulados para demonstração...")
-                        # Implementar geração de dados simulados
-            
-            # Auto-refresh a cada 30 segundos
-            if auto_refresh:
-                time.sleep(30)
-                st.rerun()
+                if st.button("Exportar Dados"):
+                    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                    st.download_button(
+                        label="Download Parquet",
+                        data=self.export_bytes(df, 'parquet'),
+                        file_name=f"smart_maintenance_data_{stamp}.parquet",
+                        mime="application/octet-stream"
+                    )
+                    st.download_button(
+                        label="Download CSV",
+                        data=self.export_bytes(df, 'csv'),
+                        file_name=f"smart_maintenance_data_{stamp}.csv",
+                        mime="text/csv"
+                    )
+        
+        else:
+            st.warning("⚠️ Nenhum dado disponível. Verifique a conexão com o banco de dados.")
+            
+            # Dados simulados para demonstração
+            if st.button("Usar Dados Simulados"):
+                st.info("Gerando dados simulados para demonstração...")
+                # Implementar geração de dados simulados
+        
+        # Auto-refresh a cada 30 segundos (fallback bloqueante sem streamlit-autorefresh)
+        if auto_refresh and not AUTOREFRESH_AVAILABLE:
+            time.sleep(30)
+            st.rerun()
 
 # ===========================================
 # EXECUÇÃO PRINCIPAL
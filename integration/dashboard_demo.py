@@ -12,10 +12,37 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from datetime import datetime, timedelta
+import importlib.util
 import time
 import json
 
+# tsdownsample (opcional): sem ele a redução usa mínimo/máximo por bloco em NumPy
+try:
+    from tsdownsample import MinMaxLTTBDownsampler
+    TSDOWNSAMPLE_AVAILABLE = True
+except ImportError:
+    TSDOWNSAMPLE_AVAILABLE = False
+
+# orjson (opcional): figuras Plotly serializadas em C, com arrays NumPy sem conversão
+# elemento a elemento; sem ele o Plotly usa o json da stdlib
+if importlib.util.find_spec('orjson') is not None:
+    pio.json.config.default_engine = 'orjson'
+
+# streamlit-autorefresh (opcional): sem ele o auto-refresh volta a ser sleep + rerun
+try:
+    from streamlit_autorefresh import st_autorefresh
+    AUTOREFRESH_AVAILABLE = True
+except ImportError:
+    AUTOREFRESH_AVAILABLE = False
+
+# st.fragment (Streamlit >= 1.37) permite reexecutar só o painel ao vivo
+FRAGMENT_AVAILABLE = hasattr(st, 'fragment')
+
+# Pontos por equipamento em cada série enviada ao Plotly
+MAX_POINTS_PER_SERIES = 2000
+
 # ===========================================
 # CONFIGURAÇÃO DA PÁGINA
 # ===========================================
@@ -27,61 +54,81 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Layout comum às figuras, registrado uma vez; cada figura só define o que é dela
+pio.templates['smartmaint'] = go.layout.Template(layout=go.Layout(
+    height=400,
+    hovermode='x unified',
+    xaxis=dict(title='Tempo')
+))
+pio.templates.default = 'plotly+smartmaint'
+
 # ===========================================
 # FUNÇÕES AUXILIARES
 # ===========================================
 
-@st.cache_data
-def generate_sample_data():
-    """Gerar dados de exemplo para demonstração"""
+def frame_fingerprint(df):
+    """Chave barata para o cache: nº de linhas e timestamps das pontas do frame"""
+    if df.empty:
+        return (0,)
+    timestamps = df['timestamp']
+    return (len(df), timestamps.iat[0].value, timestamps.iat[-1].value)
+
+# Resultados derivados reaproveitados entre reruns do auto-refresh
+FRAME_HASH_FUNCS = {pd.DataFrame: frame_fingerprint}
+
+def current_hour() -> datetime:
+    """Hora cheia atual (âncora da chave de cache dos dados de exemplo)"""
+    return datetime.now().replace(minute=0, second=0, microsecond=0)
+
+# Persistido em disco: reinícios do servidor não pagam a geração de novo. O persist
+# ignora ttl, então a âncora horária na chave faz a entrada expirar a cada hora
+# (max_entries=1 descarta a anterior) e a janela de 24h nunca fica vazia
+@st.cache_data(persist="disk", show_spinner=False, max_entries=1)
+def generate_sample_data(anchor: datetime):
+    """Gerar dados de exemplo para demonstração (30 dias até `anchor`)"""
     
     # Simular dados dos últimos 30 dias
-    end_date = datetime.now()
+    end_date = anchor
     start_date = end_date - timedelta(days=30)
     
     # Criar timeline
     timestamps = pd.date_range(start_date, end_date, freq='H')
     
-    data = []
-    for i, timestamp in enumerate(timestamps):
-        # Simular 5 equipamentos
-        for equipment_id in range(1, 6):
-            # Simular temperatura com variação
-            base_temp = 70 + equipment_id * 5
-            temp_variation = np.sin(i * 0.1) * 10 + np.random.normal(0, 3)
-            temperature = base_temp + temp_variation
-            
-            # Simular outros parâmetros
-            pressure = np.random.normal(1013, 20)
-            humidity = np.random.uniform(30, 80)
-            vibration = np.random.exponential(2)
-            
-            # Simular falhas ocasionais
-            fault_probability = 0.05
-            if temperature > 95:
-                fault_probability = 0.8
-            
-            is_fault = np.random.random() < fault_probability
-            
-            data.append({
-                'timestamp': timestamp,
-                'equipment_id': f'PUMP_{equipment_id:03d}',
-                'temperature': temperature,
-                'pressure': pressure,
-                'humidity': humidity,
-                'vibration': vibration,
-                'fault': is_fault,
-                'location': f'Factory_{chr(65 + equipment_id % 3)}',
-                'type': 'Pump'
-            })
-    
-    return pd.DataFrame(data)
+    # Grade tempo x equipamento (5 equipamentos), achatada em ordem de tempo
+    rng = np.random.default_rng()
+    equipment_ids = np.arange(1, 6)
+    n_t, n_e = len(timestamps), len(equipment_ids)
+    n = n_t * n_e
+    i_grid, eq_grid = np.meshgrid(np.arange(n_t), equipment_ids, indexing='ij')
+    
+    # Simular temperatura com variação
+    base_temp = 70 + eq_grid * 5
+    temperature = (base_temp + np.sin(i_grid * 0.1) * 10 + rng.normal(0, 3, (n_t, n_e))).ravel()
+    
+    # Simular falhas ocasionais
+    fault_probability = np.where(temperature > 95, 0.8, 0.05)
+    
+    return pd.DataFrame({
+        'timestamp': np.repeat(timestamps, n_e),
+        'equipment_id': pd.Categorical.from_codes(
+            np.tile(np.arange(n_e), n_t), categories=[f'PUMP_{e:03d}' for e in equipment_ids]
+        ),
+        'temperature': temperature,
+        'pressure': rng.normal(1013, 20, n),
+        'humidity': rng.uniform(30, 80, n),
+        'vibration': rng.exponential(2, n),
+        'fault': rng.random(n) < fault_probability,
+        'location': np.tile([f'Factory_{chr(65 + e % 3)}' for e in equipment_ids], n_t),
+        'type': 'Pump'
+    })
 
-def calculate_kpis(df):
-    """Calcular KPIs principais"""
-    
-    # Filtrar dados das últimas 24 horas
-    recent_data = df[df['timestamp'] >= (datetime.now() - timedelta(hours=24))]
+def slice_since(df, cutoff):
+    """Linhas com timestamp >= cutoff (df ordenado por tempo: busca binária, sem máscara)"""
+    return df.iloc[df['timestamp'].searchsorted(cutoff):]
+
+@st.cache_data(ttl=30, hash_funcs=FRAME_HASH_FUNCS)
+def calculate_kpis(df, recent_data):
+    """Calcular KPIs principais (recent_data: fatia das últimas 24 horas)"""
     
     kpis = {
         'avg_temperature': recent_data['temperature'].mean(),
@@ -93,86 +140,104 @@ def calculate_kpis(df):
     
     return kpis
 
-def generate_alerts(df):
-    """Gerar alertas baseados em thresholds"""
-    
-    recent_data = df[df['timestamp'] >= (datetime.now() - timedelta(hours=1))]
-    alerts = []
-    
-    for _, row in recent_data.iterrows():
-        alert_type = None
-        severity = None
-        
-        if row['temperature'] > 95:
-            alert_type = "TEMPERATURE_HIGH"
-            severity = "CRITICAL"
-        elif row['temperature'] > 85:
-            alert_type = "TEMPERATURE_HIGH" 
-            severity = "WARNING"
-        
-        if row['pressure'] < 960 or row['pressure'] > 1040:
-            alert_type = "PRESSURE_ABNORMAL"
-            severity = "CRITICAL"
-        
-        if row['humidity'] > 80:
-            alert_type = "HUMIDITY_HIGH"
-            severity = "WARNING"
+@st.cache_data(ttl=30, hash_funcs=FRAME_HASH_FUNCS)
+def generate_alerts(recent_data):
+    """Gerar alertas baseados em thresholds (recent_data: fatia da última hora)"""
+    
+    temperature = recent_data['temperature'].to_numpy()
+    pressure = recent_data['pressure'].to_numpy()
+    humidity = recent_data['humidity'].to_numpy()
+    
+    # Máscaras sobre o frame inteiro; a ordem do np.select mantém a precedência
+    # anterior (umidade > pressão > temperatura: a última regra que dispara vence)
+    temp_crit = temperature > 95
+    temp_warn = temperature > 85
+    press_mask = (pressure < 960) | (pressure > 1040)
+    hum_mask = humidity > 80
+    
+    alert_type = np.select(
+        [hum_mask, press_mask, temp_warn],
+        ['HUMIDITY_HIGH', 'PRESSURE_ABNORMAL', 'TEMPERATURE_HIGH'],
+        default=''
+    )
+    severity = np.select(
+        [hum_mask, press_mask, temp_crit, temp_warn],
+        ['WARNING', 'CRITICAL', 'CRITICAL', 'WARNING'],
+        default=''
+    )
+    is_temp = alert_type == 'TEMPERATURE_HIGH'
+    mask = alert_type != ''
+    
+    return pd.DataFrame({
+        'equipment_id': recent_data['equipment_id'].to_numpy()[mask],
+        'alert_type': alert_type[mask],
+        'severity': severity[mask],
+        'value': np.where(is_temp, temperature, pressure)[mask],
+        'timestamp': recent_data['timestamp'].to_numpy()[mask]
+    }).to_dict('records')
+
+def downsample_indices(x, y, n_out=MAX_POINTS_PER_SERIES):
+    """Índices de até n_out pontos que preservam o formato visual da série"""
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    
+    if TSDOWNSAMPLE_AVAILABLE:
+        return MinMaxLTTBDownsampler().downsample(x, y, n_out=n_out)
+    
+    # Fallback: mínimo e máximo de cada um dos n_out/2 blocos
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    bins = np.repeat(np.arange(len(edges) - 1), np.diff(edges))
+    order = np.lexsort((y, bins))
+    return np.unique(np.concatenate([order[edges[:-1]], order[edges[1:] - 1]]))
+
+@st.cache_data(ttl=30, hash_funcs=FRAME_HASH_FUNCS)
+def series_with_gaps(df, columns):
+    """Séries (tempo, valor, equipamento, código) por coluna, reduzidas por equipamento e com gap NaN/NaT entre equipamentos"""
+    # Uma única ordenação e um único corte por equipamento, compartilhados por todas as colunas
+    ordered = df.sort_values(['equipment_id', 'timestamp'])
+    codes = pd.Categorical(ordered['equipment_id']).codes
+    timestamps = ordered['timestamp'].to_numpy()
+    x = timestamps.astype(np.int64)
+    names = ordered['equipment_id'].to_numpy().astype(object)
+    bounds = np.r_[0, np.flatnonzero(np.diff(codes)) + 1, len(codes)]
+    
+    payloads = {}
+    for column in columns:
+        values = ordered[column].to_numpy(dtype=np.float64)
+        kept = [
+            start + downsample_indices(x[start:end], values[start:end])
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        gaps = np.cumsum([len(k) for k in kept])[:-1]
+        keep = np.concatenate(kept)
         
-        if alert_type:
-            alerts.append({
-                'equipment_id': row['equipment_id'],
-                'alert_type': alert_type,
-                'severity': severity,
-                'value': row['temperature'] if 'TEMPERATURE' in alert_type else row['pressure'],
-                'timestamp': row['timestamp']
-            })
-    
-    return alerts
+        payloads[column] = {
+            'timestamp': np.insert(timestamps[keep], gaps, np.datetime64('NaT')),
+            'value': np.insert(values[keep], gaps, np.nan),
+            'equipment_id': np.insert(names[keep], gaps, None),
+            # Código do equipamento para colorir os pontos (um único trace por métrica)
+            'code': np.insert(codes[keep].astype(float), gaps, np.nan)
+        }
+    
+    return payloads
 
 # ===========================================
 # INTERFACE PRINCIPAL
 # ===========================================
 
-def main():
-    """Função principal do dashboard"""
-    
-    # Header
-    st.markdown("""
-    <div style='text-align: center; padding: 1rem; background: linear-gradient(90deg, #1f4e79, #2e86de); border-radius: 10px; margin-bottom: 2rem;'>
-        <h1 style='color: white; margin: 0;'>🏭 Smart Maintenance SaaS</h1>
-        <p style='color: #f1f2f6; margin: 0;'>Dashboard de Monitoramento em Tempo Real - DEMO</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Sidebar
-    with st.sidebar:
-        st.title("⚙️ Controles")
-        
-        # Auto-refresh
-        auto_refresh = st.checkbox("Auto-refresh (30s)", value=False)
-        
-        if st.button("🔄 Atualizar Dados"):
-            st.cache_data.clear()
-            st.rerun()
-        
-        # Filtros
-        st.subheader("Filtros")
-        time_range = st.selectbox(
-            "Período:",
-            ["Última hora", "Últimas 6 horas", "Últimas 24 horas", "Últimos 7 dias"],
-            index=2
-        )
-        
-        # Status
-        st.subheader("Status do Sistema")
-        st.success("🟢 Dashboard: Ativo")
-        st.info("🔵 Dados: Simulados")
-        st.warning("🟡 Base Real: Não conectada")
+def render_live_panel():
+    """KPIs, gráficos, alertas e tabela de status (parte que muda a cada refresh)"""
     
     # Carregar dados
-    df = generate_sample_data()
-    kpis = calculate_kpis(df)
-    alerts = generate_alerts(df)
+    df = generate_sample_data(current_hour())
+    
+    # Janelas calculadas uma única vez e reaproveitadas (views, sem cópia)
+    now = datetime.now()
+    recent_df = slice_since(df, now - timedelta(hours=24))
+    kpis = calculate_kpis(df, recent_df)
+    alerts = generate_alerts(slice_since(recent_df, now - timedelta(hours=1)))
+    series = series_with_gaps(recent_df, ('temperature', 'pressure', 'vibration'))
     
     # KPIs
     st.subheader("📊 Indicadores Principais")
@@ -217,21 +282,20 @@ def main():
     with col1:
         st.write("**Temperatura por Equipamento (Últimas 24h)**")
         
-        # Filtrar últimas 24 horas
-        recent_df = df[df['timestamp'] >= (datetime.now() - timedelta(hours=24))]
+        # Um único trace WebGL; equipamentos separados por gaps e coloridos por código
+        temp_series = series['temperature']
         
         fig_temp = go.Figure()
-        
-        for equipment in recent_df['equipment_id'].unique():
-            eq_data = recent_df[recent_df['equipment_id'] == equipment]
-            fig_temp.add_trace(go.Scatter(
-                x=eq_data['timestamp'],
-                y=eq_data['temperature'],
-                mode='lines+markers',
-                name=equipment,
-                line=dict(width=2),
-                marker=dict(size=4)
-            ))
+        fig_temp.add_trace(go.Scattergl(
+            x=temp_series['timestamp'],
+            y=temp_series['value'],
+            text=temp_series['equipment_id'],
+            mode='lines+markers',
+            name="Temperatura",
+            line=dict(width=2),
+            marker=dict(size=4, color=temp_series['code'], colorscale='Viridis'),
+            hovertemplate="%{text}: %{y:.1f}°C<extra></extra>"
+        ))
         
         # Linha de threshold crítico
         fig_temp.add_hline(
@@ -241,27 +305,18 @@ def main():
             annotation_text="Crítico (95°C)"
         )
         
-        fig_temp.update_layout(
-            height=400,
-            xaxis_title="Tempo",
-            yaxis_title="Temperatura (°C)",
-            hovermode='x unified'
-        )
+        fig_temp.update_layout(yaxis_title="Temperatura (°C)")
         
         st.plotly_chart(fig_temp, use_container_width=True)
     
     with col2:
         st.write("**Distribuição de Status**")
         
-        # Calcular status por temperatura
-        temp_status = []
-        for temp in recent_df['temperature']:
-            if temp > 95:
-                temp_status.append('CRITICAL')
-            elif temp > 85:
-                temp_status.append('WARNING')
-            else:
-                temp_status.append('NORMAL')
+        # Calcular status por temperatura (faixas (-inf, 85], (85, 95], (95, inf))
+        status_labels = np.array(['NORMAL', 'WARNING', 'CRITICAL'])
+        temp_status = status_labels[
+            np.digitize(recent_df['temperature'].to_numpy(), [85, 95], right=True)
+        ]
         
         status_counts = pd.Series(temp_status).value_counts()
         
@@ -273,7 +328,6 @@ def main():
         )])
         
         fig_pie.update_layout(
-            height=400,
             annotations=[dict(text='Status', x=0.5, y=0.5, font_size=20, showarrow=False)]
         )
         
@@ -284,35 +338,37 @@ def main():
     
     fig_multi = go.Figure()
     
-    # Adicionar pressão
-    for equipment in recent_df['equipment_id'].unique():
-        eq_data = recent_df[recent_df['equipment_id'] == equipment]
-        fig_multi.add_trace(go.Scatter(
-            x=eq_data['timestamp'],
-            y=eq_data['pressure'],
-            mode='lines',
-            name=f"{equipment} - Pressão",
-            yaxis='y'
-        ))
-    
-    # Adicionar vibração no eixo secundário
-    for equipment in recent_df['equipment_id'].unique():
-        eq_data = recent_df[recent_df['equipment_id'] == equipment]
-        fig_multi.add_trace(go.Scatter(
-            x=eq_data['timestamp'],
-            y=eq_data['vibration'],
-            mode='lines',
-            name=f"{equipment} - Vibração",
-            yaxis='y2',
-            line=dict(dash='dash')
-        ))
+    # Pressão e vibração: um trace por eixo, cores por equipamento
+    press_series = series['pressure']
+    vib_series = series['vibration']
+    
+    fig_multi.add_trace(go.Scattergl(
+        x=press_series['timestamp'],
+        y=press_series['value'],
+        text=press_series['equipment_id'],
+        mode='lines+markers',
+        name="Pressão",
+        yaxis='y',
+        marker=dict(size=3, color=press_series['code'], colorscale='Viridis'),
+        hovertemplate="%{text}: %{y:.1f} hPa<extra></extra>"
+    ))
+    
+    # Vibração no eixo secundário
+    fig_multi.add_trace(go.Scattergl(
+        x=vib_series['timestamp'],
+        y=vib_series['value'],
+        text=vib_series['equipment_id'],
+        mode='lines+markers',
+        name="Vibração",
+        yaxis='y2',
+        line=dict(dash='dash'),
+        marker=dict(size=3, color=vib_series['code'], colorscale='Viridis'),
+        hovertemplate="%{text}: %{y:.2f} m/s²<extra></extra>"
+    ))
     
     fig_multi.update_layout(
-        height=400,
-        xaxis_title="Tempo",
         yaxis=dict(title="Pressão (hPa)", side='left'),
-        yaxis2=dict(title="Vibração (m/s²)", side='right', overlaying='y'),
-        hovermode='x unified'
+        yaxis2=dict(title="Vibração (m/s²)", side='right', overlaying='y')
     )
     
     st.plotly_chart(fig_multi, use_container_width=True)
@@ -352,8 +408,8 @@ def main():
     # Tabela de equipamentos
     st.subheader("🏭 Status dos Equipamentos")
     
-    # Criar resumo por equipamento
-    equipment_summary = recent_df.groupby('equipment_id').agg({
+    # Criar resumo por equipamento (agrupamento pelos códigos da coluna categórica)
+    equipment_summary = recent_df.groupby('equipment_id', observed=True).agg({
         'temperature': ['mean', 'max'],
         'pressure': 'mean',
         'humidity': 'mean',
@@ -366,18 +422,71 @@ def main():
     equipment_summary.columns = ['Temp_Média', 'Temp_Máxima', 'Pressão_Média', 
                                 'Umidade_Média', 'Vibração_Média', 'Total_Falhas', 'Última_Leitura']
     
-    # Status
-    equipment_summary['Status'] = equipment_summary.apply(
-        lambda row: '🔥 CRÍTICO' if row['Temp_Máxima'] > 95 or row['Total_Falhas'] > 2
-        else '⚠️ ATENÇÃO' if row['Temp_Máxima'] > 85 or row['Total_Falhas'] > 0
-        else '✅ OK', axis=1
+    # Status (máscaras vetorizadas em vez de apply por linha)
+    temp_max = equipment_summary['Temp_Máxima'].to_numpy()
+    total_faults = equipment_summary['Total_Falhas'].to_numpy()
+    critical = (temp_max > 95) | (total_faults > 2)
+    attention = (temp_max > 85) | (total_faults > 0)
+    equipment_summary['Status'] = np.select(
+        [critical, attention],
+        ['🔥 CRÍTICO', '⚠️ ATENÇÃO'],
+        default='✅ OK'
     )
     
-    st.dataframe(
-        equipment_summary,
-        use_container_width=True,
-        height=300
-    )
+    # Poucas linhas (uma por equipamento): tabela estática, sem o grid interativo
+    st.table(equipment_summary.style.format({
+        'Temp_Média': '{:.1f}',
+        'Temp_Máxima': '{:.1f}',
+        'Pressão_Média': '{:.1f}',
+        'Umidade_Média': '{:.1f}',
+        'Vibração_Média': '{:.2f}'
+    }))
+
+def main():
+    """Função principal do dashboard"""
+    
+    # Header
+    st.markdown("""
+    <div style='text-align: center; padding: 1rem; background: linear-gradient(90deg, #1f4e79, #2e86de); border-radius: 10px; margin-bottom: 2rem;'>
+        <h1 style='color: white; margin: 0;'>🏭 Smart Maintenance SaaS</h1>
+        <p style='color: #f1f2f6; margin: 0;'>Dashboard de Monitoramento em Tempo Real - DEMO</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Sidebar
+    with st.sidebar:
+        st.title("⚙️ Controles")
+        
+        # Auto-refresh
+        auto_refresh = st.checkbox("Auto-refresh (30s)", value=False)
+        
+        if st.button("🔄 Atualizar Dados"):
+            st.cache_data.clear()
+            st.rerun()
+        
+        # Filtros
+        st.subheader("Filtros")
+        time_range = st.selectbox(
+            "Período:",
+            ["Última hora", "Últimas 6 horas", "Últimas 24 horas", "Últimos 7 dias"],
+            index=2
+        )
+        
+        # Status
+        st.subheader("Status do Sistema")
+        st.success("🟢 Dashboard: Ativo")
+        st.info("🔵 Dados: Simulados")
+        st.warning("🟡 Base Real: Não conectada")
+    
+    # Painel ao vivo: com fragment, o auto-refresh reexecuta só este trecho
+    if auto_refresh and FRAGMENT_AVAILABLE:
+        st.fragment(run_every=30)(render_live_panel)()
+    else:
+        render_live_panel()
+    
+    # Cartões estáticos (leituras em cache, fora do refresh periódico)
+    df = generate_sample_data(current_hour())
+    alerts = generate_alerts(slice_since(df, datetime.now() - timedelta(hours=1)))
     
     # Informações do sistema
     st.subheader("ℹ️ Informações do Sistema")
@@ -411,10 +520,13 @@ def main():
         - Alertas enviados: {len(alerts)}
         """)
     
-    # Auto-refresh
-    if auto_refresh:
-        time.sleep(30)
-        st.rerun()
+    # Auto-refresh sem fragment: timer no navegador ou, em último caso, sleep + rerun
+    if auto_refresh and not FRAGMENT_AVAILABLE:
+        if AUTOREFRESH_AVAILABLE:
+            st_autorefresh(interval=30_000, key='demo_refresh')
+        else:
+            time.sleep(30)
+            st.rerun()
 
 # ===========================================
 # EXECUÇÃO
@@ -8,8 +8,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import sqlite3
 from pathlib import Path
+from sqlalchemy import create_engine, text
 
 # Configuração da página
 st.set_page_config(
@@ -18,45 +18,92 @@ st.set_page_config(
     layout="wide"
 )
 
-@st.cache_data(ttl=30)
+DB_PATH = Path("smart_maintenance.db")
+
+# Tipos das medições lidas do SQLite (evita inferência e colunas object)
+MEDICAO_DTYPES = {
+    'vl_temperatura': 'float32',
+    'vl_pressao': 'float32',
+    'vl_humidade': 'float32',
+    'id_maquina': 'category',
+    'flag_falha': 'category'
+}
+# ISO8601 cobre tanto 'YYYY-MM-DD HH:MM:SS' quanto isoformat() com 'T' e microssegundos
+MEDICAO_PARSE_DATES = {'dataHora_medicao': {'format': 'ISO8601'}}
+
+@st.cache_resource
+def get_engine():
+    """Engine SQLAlchemy compartilhada entre reruns e sessões"""
+    return create_engine(
+        f"sqlite:///{DB_PATH}",
+        connect_args={"check_same_thread": False}
+    )
+
+@st.cache_data(ttl=30, max_entries=1)
 def load_data():
-    """Carregar dados do SQLite"""
+    """Carregar dados do SQLite (reduções feitas no próprio banco)"""
     try:
-        db_path = Path("smart_maintenance.db")
-        if not db_path.exists():
+        if not DB_PATH.exists():
             st.error("❌ Banco SQLite não encontrado!")
-            return None, None, None
-            
-        conn = sqlite3.connect(str(db_path))
+            return None, None, None, None, None
+        
+        # Corte de 24h no mesmo formato gravado em dataHora_medicao (isoformat local,
+        # separador 'T'): a comparação de texto fica correta e usa IDX_MEDICAO_TEMPO
+        corte_24h = (datetime.now() - timedelta(hours=24)).isoformat()
+        
+        # Cursor em modo streaming: linhas lidas sob demanda, sem lista intermediária
+        with get_engine().connect().execution_options(stream_results=True) as conn:
+            # Dados dos equipamentos
+            equipamentos = pd.read_sql("""
+                SELECT * FROM T_EQUIPAMENTO
+            """, conn)
+        
+            # Resumo por equipamento nas últimas 24h (usa IDX_MEDICAO_TEMPO)
+            resumo = pd.read_sql(text("""
+                SELECT 
+                    id_maquina,
+                    COUNT(*) AS n_medicoes,
+                    SUM(vl_temperatura) AS soma_temp,
+                    COUNT(vl_temperatura) AS n_temp,
+                    MAX(vl_temperatura) AS max_temp,
+                    SUM(CASE WHEN flag_falha = 'S' THEN 1 ELSE 0 END) AS falhas
+                FROM T_MEDICAO
+                WHERE dataHora_medicao >= :corte
+                GROUP BY id_maquina
+            """), conn, params={'corte': corte_24h})
         
-        # Dados dos equipamentos
-        equipamentos = pd.read_sql("""
-            SELECT * FROM T_EQUIPAMENTO
-        """, conn)
+            # Faixas de 5°C por equipamento (distribuição de temperatura)
+            distribuicao = pd.read_sql(text("""
+                SELECT 
+                    id_maquina,
+                    CAST(vl_temperatura / 5 AS INTEGER) * 5 AS faixa_temp,
+                    COUNT(*) AS n_medicoes
+                FROM T_MEDICAO
+                WHERE dataHora_medicao >= :corte
+                  AND vl_temperatura IS NOT NULL
+                GROUP BY id_maquina, faixa_temp
+            """), conn, params={'corte': corte_24h})
         
-        # Dados das medições
-        medicoes = pd.read_sql("""
-            SELECT 
-                m.*,
-                e.tipo_maquina,
-                e.localizacao
-            FROM T_MEDICAO m
-            JOIN T_EQUIPAMENTO e ON m.id_maquina = e.id_maquina
-            ORDER BY m.dataHora_medicao DESC
-            LIMIT 1000
-        """, conn)
+            # Medições recentes (apenas as linhas e colunas exibidas)
+            recentes = pd.read_sql("""
+                SELECT 
+                    id_maquina, id_sensor, dataHora_medicao,
+                    vl_temperatura, vl_pressao, vl_humidade, flag_falha
+                FROM T_MEDICAO
+                ORDER BY dataHora_medicao DESC
+                LIMIT 20
+            """, conn, parse_dates=MEDICAO_PARSE_DATES, dtype=MEDICAO_DTYPES)
         
-        # Estatísticas
-        stats = pd.read_sql("""
-            SELECT * FROM V_STATS_EQUIPAMENTO
-        """, conn)
+            # Estatísticas
+            stats = pd.read_sql("""
+                SELECT * FROM V_STATS_EQUIPAMENTO
+            """, conn)
         
-        conn.close()
-        return equipamentos, medicoes, stats
+            return equipamentos, resumo, distribuicao, recentes, stats
         
     except Exception as e:
         st.error(f"Erro ao carregar dados: {str(e)}")
-        return None, None, None
+        return None, None, None, None, None
 
 def main():
     # Título
@@ -64,9 +111,9 @@ def main():
     st.markdown("### Sistema de Manutenção Preditiva Industrial")
     
     # Carregar dados
-    equipamentos, medicoes, stats = load_data()
+    equipamentos, resumo, distribuicao, recentes, stats = load_data()
     
-    if medicoes is None:
+    if resumo is None:
         st.stop()
     
     # Métricas principais
@@ -81,13 +128,14 @@ def main():
     
     with col2:
         st.metric(
-            "Total Medições",
-            len(medicoes),
-            delta=f"+{len(medicoes.tail(100))} (últimas 100)"
+            "Medições (24h)",
+            int(resumo['n_medicoes'].sum()),
+            delta=None
         )
     
     with col3:
-        temp_media = medicoes['vl_temperatura'].mean() if 'vl_temperatura' in medicoes.columns else 0
+        n_temp = resumo['n_temp'].sum()
+        temp_media = resumo['soma_temp'].sum() / n_temp if n_temp else 0
         st.metric(
             "Temperatura Média",
             f"{temp_media:.1f}°C",
@@ -95,7 +143,7 @@ def main():
         )
     
     with col4:
-        falhas = len(medicoes[medicoes['flag_falha'] == 'S']) if 'flag_falha' in medicoes.columns else 0
+        falhas = int(resumo['falhas'].sum())
         st.metric(
             "Alertas Ativos",
             falhas,
@@ -107,14 +155,16 @@ def main():
     
     with col1:
         st.subheader("📊 Temperatura por Equipamento")
-        if 'vl_temperatura' in medicoes.columns:
-            fig = px.box(
-                medicoes, 
-                x='id_maquina', 
-                y='vl_temperatura',
+        if not distribuicao.empty:
+            fig = px.density_heatmap(
+                distribuicao,
+                x='id_maquina',
+                y='faixa_temp',
+                z='n_medicoes',
+                histfunc='sum',
                 title="Distribuição de Temperatura"
             )
-            fig.update_layout(height=400)
+            fig.update_layout(height=400, yaxis_title="Temperatura (faixas de 5°C)")
             st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -132,19 +182,13 @@ def main():
     # Tabela de dados recentes
     st.subheader("📋 Medições Recentes")
     
-    if not medicoes.empty:
-        # Mostrar apenas colunas relevantes
-        display_cols = [
-            'id_maquina', 'id_sensor', 'dataHora_medicao',
-            'vl_temperatura', 'vl_pressao', 'vl_humidade', 'flag_falha'
-        ]
-        
-        available_cols = [col for col in display_cols if col in medicoes.columns]
-        
-        st.dataframe(
-            medicoes[available_cols].head(20),
-            use_container_width=True
-        )
+    if not recentes.empty:
+        # 20 linhas: tabela estática, sem o grid interativo
+        st.table(recentes.style.format({
+            'vl_temperatura': '{:.1f}',
+            'vl_pressao': '{:.1f}',
+            'vl_humidade': '{:.1f}'
+        }, na_rep='-'))
     
     # Informações do sistema
     with st.sidebar:
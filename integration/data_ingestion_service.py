@@ -17,22 +17,55 @@ Funcionalidades:
 Autor: Challenge Hermes Reply Team
 """
 
+import gc
 import json
 import logging
+import logging.handlers
+import queue
+import sys
 import time
 import threading
-from datetime import datetime
-from typing import Dict, List, Optional
-from queue import Queue
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import paho.mqtt.client as mqtt
 import cx_Oracle
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 import pandas as pd
+import numpy as np
 import schedule
 
+# orjson (opcional): parse/serialização JSON em C; sem ele usa o json da stdlib.
+# orjson.JSONDecodeError herda de json.JSONDecodeError, então os handlers valem para ambos
+try:
+    import orjson
+    json_loads = orjson.loads
+    
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+# ciso8601 (opcional): parse ISO 8601 em C, aceita 'Z' sem troca de string
+try:
+    from ciso8601 import parse_datetime as parse_timestamp
+except ImportError:
+    def parse_timestamp(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+# pysimdjson (opcional): payload de sensores lido sob demanda, só os campos usados
+# (sem montar o dict completo); sem ele o payload é decodificado com json_loads
+try:
+    import simdjson
+    SIMDJSON_AVAILABLE = True
+except ImportError:
+    SIMDJSON_AVAILABLE = False
+
 # ===========================================
 # CONFIGURAÇÕES
 # ===========================================
@@ -55,7 +88,8 @@ DB_CONFIG = {
     'user': 'your_db_user',
     'password': 'your_db_password', 
     'dsn': 'localhost:1521/xe',  # Ajuste para seu Oracle DB
-    'encoding': 'UTF-8'
+    'encoding': 'UTF-8',
+    'pool_min': 2  # Sessões abertas de início (máximo: insert_workers + 1)
 }
 
 # Sistema Configuration
@@ -63,16 +97,88 @@ SYSTEM_CONFIG = {
     'log_level': logging.INFO,
     'buffer_size': 1000,
     'batch_insert_size': 50,
+    'insert_workers': 4,  # threads de inserção, cada uma com sua sessão do pool
     'processing_interval': 5,  # seconds
+    'max_payload_size': 64 * 1024,  # bytes; mensagens maiores são descartadas
     'heartbeat_interval': 30,  # seconds
     'max_retries': 3
 }
 
+# Inserção em lote (array DML): mesmo INSERT do SP_INSERT_MEDICAO, com um
+# único round-trip e um único commit por lote
+INSERT_MEDICAO_SQL = """
+    INSERT INTO T_MEDICAO (
+        id_sensor, id_maquina, vl_temperatura, vl_pressao,
+        vl_vibracao, vl_humidade, vl_vibr_x, vl_vibr_y, vl_vibr_z,
+        vl_gyro_x, vl_gyro_y, vl_gyro_z, flag_falha, fonte_dados
+    ) VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :13, :14)
+"""
+
+# Cadastro de equipamento e sensor de um dispositivo novo: os dois MERGE (sem
+# corrida entre consulta e INSERT) em um único bloco, com uma ida ao banco
+ENSURE_DEVICE_SQL = """
+    BEGIN
+        MERGE INTO T_EQUIPAMENTO e
+        USING (SELECT :id_maquina AS id_maquina FROM DUAL) n
+        ON (e.id_maquina = n.id_maquina)
+        WHEN NOT MATCHED THEN
+            INSERT (id_maquina, tipo_maquina, localizacao)
+            VALUES (n.id_maquina, :tipo_maquina, :localizacao);
+        :novo_equipamento := SQL%ROWCOUNT;
+        
+        MERGE INTO T_SENSOR s
+        USING (SELECT :id_sensor AS id_sensor FROM DUAL) n
+        ON (s.id_sensor = n.id_sensor)
+        WHEN NOT MATCHED THEN
+            INSERT (id_sensor, tipo_sensor, unidade_medida)
+            VALUES (n.id_sensor, 'ESP32_Multi', 'Mixed');
+        :novo_sensor := SQL%ROWCOUNT;
+    END;
+"""
+
+# Valores numéricos de T_MEDICAO na ordem do INSERT_MEDICAO_SQL (:3 a :12);
+# 'vibration' (módulo do vetor x/y/z) é calculada no flush do lote
+SENSOR_COLUMNS = (
+    'temperature', 'pressure', 'vibration', 'humidity',
+    'vibr_x', 'vibr_y', 'vibr_z', 'gyro_x', 'gyro_y', 'gyro_z'
+)
+
+# Chaves do payload aceitas para cada coluna, em ordem de preferência
+SENSOR_KEYS = {
+    'temperature': ('temperature',),
+    'pressure': ('pressure',),
+    'vibration': (),  # sem chave no payload: calculada por lote
+    'humidity': ('humidity',),
+    'vibr_x': ('vibration_x', 'vibr_x'),
+    'vibr_y': ('vibration_y', 'vibr_y'),
+    'vibr_z': ('vibration_z', 'vibr_z'),
+    'gyro_x': ('gyro_x',),
+    'gyro_y': ('gyro_y',),
+    'gyro_z': ('gyro_z',)
+}
+
+# Largura máxima do device_id no buffer (IDs maiores são rejeitados, não truncados)
+DEVICE_ID_MAX_LEN = 64
+
+# Linha do buffer de ingestão (colunas contíguas; NaN = sensor ausente)
+READING_DTYPE = np.dtype([
+    ('device_id', f'U{DEVICE_ID_MAX_LEN}'),
+    ('timestamp', 'datetime64[us]'),
+    ('location', 'U50'),
+    ('equipment_type', 'U16'),
+    *[(column, 'f8') for column in SENSOR_COLUMNS],
+    ('fault', '?'),
+    ('source', 'U16')
+])
+
 # ===========================================
 # ESTRUTURAS DE DADOS
 # ===========================================
 
-@dataclass
+# slots=True (sem __dict__ por instância) só existe a partir do Python 3.10
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class SensorReading:
     """Estrutura para dados de sensores"""
     device_id: str
@@ -82,19 +188,98 @@ class SensorReading:
     sensors: Dict[str, float]
     fault_detected: bool
     source: str = "MQTT"
+
+def build_sensor_extractor():
+    """Gerar função especializada que lê as chaves de SENSOR_KEYS em uma única expressão"""
+    # Para cada coluna: primeira chave presente (não nula) entre os aliases, senão NaN
+    expressions = []
+    for column in SENSOR_COLUMNS:
+        expression = 'nan'
+        for key in reversed(SENSOR_KEYS[column]):
+            expression = f"(v if (v := get({key!r})) is not None else {expression})"
+        expressions.append(expression)
+    
+    source = (
+        "def extract_sensor_values(sensors):\n"
+        "    get = sensors.get\n"
+        f"    return ({', '.join(expressions)})\n"
+    )
+    namespace = {'nan': np.nan}
+    exec(source, namespace)
+    return namespace['extract_sensor_values']
+
+# Valores dos sensores na ordem de SENSOR_COLUMNS (gerada uma vez, na importação)
+extract_sensor_values = build_sensor_extractor()
+
+@lru_cache(maxsize=None)
+def device_entity_ids(device_id: str) -> Tuple[str, str]:
+    """IDs de equipamento e sensor de um dispositivo (calculados uma vez por device_id)"""
+    # Strings internadas: buscas nos caches de IDs comparam por identidade
+    device_id = str(device_id)  # np.str_ do buffer -> str
+    equipment_id = sys.intern(device_id.replace('ESP32_', '').replace('_', '') + '_EQ')
+    sensor_id = sys.intern(device_id.replace('ESP32_', 'SENS_'))
+    return equipment_id, sensor_id
+
+def reading_record(device_id: str, timestamp: datetime, location: str,
+                   equipment_type: str, sensors: Dict, fault_detected: bool,
+                   source: str = "MQTT") -> tuple:
+    """Converter uma leitura em uma linha de READING_DTYPE"""
+    # Campo de largura fixa: o NumPy converteria/truncaria o ID sem erro
+    if not isinstance(device_id, str) or len(device_id) > DEVICE_ID_MAX_LEN:
+        raise ValueError(f"device_id inválido: {device_id!r}")
+    
+    # datetime64 não guarda fuso: timestamps com fuso são normalizados para UTC
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    return (
+        device_id, timestamp, location, equipment_type,
+        *extract_sensor_values(sensors),
+        bool(fault_detected),
+        source
+    )
+
+class ReadingBuffer:
+    """Buffer duplo pré-alocado de leituras em array estruturado (uma coluna por campo)"""
+    
+    def __init__(self, capacity: int):
+        self.data = np.empty(capacity, dtype=READING_DTYPE)
+        self.spare = np.empty(capacity, dtype=READING_DTYPE)
+        self.head = 0
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+    
+    def __len__(self) -> int:
+        return self.head
+    
+    def append(self, record: tuple) -> bool:
+        """Gravar leitura na próxima posição livre; False se o buffer estiver cheio"""
+        with self.lock:
+            if self.head >= len(self.data):
+                return False
+            self.data[self.head] = record
+            self.head += 1
+            if self.head == 1:
+                # Só a primeira leitura acorda o consumidor (ele drena tudo de uma vez)
+                self.not_empty.notify()
+        return True
+    
+    def wait(self, timeout: float) -> bool:
+        """Bloquear até haver leitura pendente ou o timeout expirar"""
+        with self.lock:
+            return self.not_empty.wait_for(lambda: self.head > 0, timeout)
     
-    def to_dict(self) -> Dict:
-        return {
-            'device_id': self.device_id,
-            'timestamp': self.timestamp,
-            'location': self.location,
-            'equipment_type': self.equipment_type,
-            'sensors': self.sensors,
-            'fault_detected': self.fault_detected,
-            'source': self.source
-        }
-
-@dataclass  
+    def drain(self) -> np.ndarray:
+        """Retirar todas as leituras pendentes, em ordem de chegada"""
+        # Troca de buffers sob o lock (sem cópia); a view devolvida continua
+        # válida até o próximo drain, que volta a entregá-la ao produtor
+        with self.lock:
+            pending = self.data[:self.head]
+            self.data, self.spare = self.spare, self.data
+            self.head = 0
+        return pending
+
+@dataclass(**DATACLASS_SLOTS)
 class DatabaseStats:
     """Estatísticas do banco de dados"""
     total_records: int = 0
@@ -118,14 +303,37 @@ class DataIngestionService:
         
         # Componentes principais
         self.mqtt_client = None
-        self.db_connection = None
+        self.db_pool = None
         self.db_engine = None
         
+        # Inserção paralela: conexão e cursor próprios por thread trabalhadora
+        self.insert_executor = None
+        self.thread_state = threading.local()
+        self.worker_connections = []
+        self.worker_connections_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        
+        # Estado dos contadores incrementais (sem COUNT(*) a cada heartbeat)
+        self.stats_day = date.today()
+        self.equipment_last_seen = {}
+        
         # Controle de dados
-        self.data_queue = Queue(maxsize=SYSTEM_CONFIG['buffer_size'])
+        self.data_buffer = ReadingBuffer(SYSTEM_CONFIG['buffer_size'])
         self.stats = DatabaseStats()
         self.is_running = False
         
+        # Parser reaproveitado entre mensagens (usado só pela thread do paho); o
+        # buffer interno dele é a única área de parse e não cresce além do limite
+        self.json_parser = (
+            simdjson.Parser(max_capacity=SYSTEM_CONFIG['max_payload_size'])
+            if SIMDJSON_AVAILABLE else None
+        )
+        
+        # IDs de equipamentos/sensores já existentes no banco (evita consulta por leitura)
+        self.known_equipment = set()
+        self.known_sensors = set()
+        self.known_ids_lock = threading.Lock()
+        
         # Threading
         self.processing_thread = None
         self.heartbeat_thread = None
@@ -133,15 +341,31 @@ class DataIngestionService:
         self.logger.info("Data Ingestion Service inicializado")
         
     def setup_logging(self):
-        """Configurar sistema de logging"""
+        """Configurar sistema de logging (escrita em arquivo/console numa thread própria)"""
+        # Embutido em outro processo (ETL, sistema integrado) que já configurou o
+        # logging raiz: os registros seguem para os handlers dele
+        self.log_listener = None
+        if logging.getLogger().handlers:
+            return
+        
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler('/tmp/hermes_ingestion.log')
+        file_handler.setFormatter(formatter)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        
+        # As threads do MQTT e de processamento só enfileiram o registro; o
+        # QueueListener faz a formatação final e o I/O em segundo plano
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        self.log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+        
         logging.basicConfig(
             level=SYSTEM_CONFIG['log_level'],
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('/tmp/hermes_ingestion.log'),
-                logging.StreamHandler()
-            ]
+            handlers=[queue_handler]
         )
+        self.log_listener.start()
         
     def connect_database(self) -> bool:
         """Conectar ao Oracle Database"""
@@ -153,13 +377,21 @@ class DataIngestionService:
                 service_name=DB_CONFIG['dsn'].split('/')[-1]
             )
             
-            self.db_connection = cx_Oracle.connect(
+            # Pool de sessões: cada thread usa a sua conexão, reaproveitada entre ciclos
+            self.db_pool = cx_Oracle.SessionPool(
                 user=DB_CONFIG['user'],
                 password=DB_CONFIG['password'],
                 dsn=dsn,
+                min=DB_CONFIG['pool_min'],
+                max=SYSTEM_CONFIG['insert_workers'] + 1,
+                increment=1,
+                threaded=True,
                 encoding=DB_CONFIG['encoding']
             )
             
+            self.load_known_ids()
+            self.load_stats()
+            
             # Criar engine SQLAlchemy para operações avançadas
             connection_string = f"oracle+cx_oracle://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['dsn']}"
             self.db_engine = create_engine(connection_string)
@@ -197,10 +429,9 @@ class DataIngestionService:
         """Callback de conexão MQTT"""
         if rc == 0:
             self.logger.info("Conectado ao broker MQTT com sucesso")
-            # Subscrever aos tópicos
-            for topic in MQTT_CONFIG['topics']:
-                client.subscribe(topic)
-                self.logger.info(f"Subscrito ao tópico: {topic}")
+            # Subscrever a todos os tópicos em um único SUBSCRIBE (QoS 0)
+            client.subscribe([(topic, 0) for topic in MQTT_CONFIG['topics']])
+            self.logger.info(f"Subscrito aos tópicos: {', '.join(MQTT_CONFIG['topics'])}")
         else:
             self.logger.error(f"Falha na conexão MQTT, código: {rc}")
     
@@ -208,9 +439,20 @@ class DataIngestionService:
         """Callback de mensagem MQTT"""
         try:
             topic = msg.topic
-            payload = msg.payload.decode('utf-8')
+            payload = msg.payload  # bytes: o parser JSON decodifica e valida o UTF-8
             
-            self.logger.debug(f"Mensagem recebida do tópico {topic}: {payload[:100]}...")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Mensagem recebida do tópico %s: %s...",
+                    topic, payload[:100].decode('utf-8', errors='replace')
+                )
+            
+            # Limite de memória por mensagem: payload acima do teto nem é parseado
+            if len(payload) > SYSTEM_CONFIG['max_payload_size']:
+                self.logger.warning(
+                    f"Mensagem de {len(payload)} bytes descartada (tópico {topic})"
+                )
+                return
             
             # Processar diferentes tipos de mensagens
             if 'sensors/data' in topic:
@@ -227,26 +469,32 @@ class DataIngestionService:
         """Callback de desconexão MQTT"""
         self.logger.warning(f"Cliente MQTT desconectado, código: {rc}")
         
-    def process_sensor_data(self, payload: str):
+    def process_sensor_data(self, payload: bytes):
         """Processar dados de sensores recebidos via MQTT"""
         try:
-            # Parse JSON
-            data = json.loads(payload)
+            # Parse JSON (documento sob demanda com simdjson; válido até o próximo parse)
+            if self.json_parser is not None:
+                data = self.json_parser.parse(payload)
+            else:
+                data = json_loads(payload)
             
             # Validar estrutura básica
             required_fields = ['device_id', 'timestamp', 'sensors']
             if not all(field in data for field in required_fields):
-                self.logger.warning(f"Dados incompletos recebidos: {data}")
+                self.logger.warning(
+                    "Dados incompletos recebidos: %s", payload.decode('utf-8', errors='replace')
+                )
                 return
             
-            # Converter timestamp
-            if isinstance(data['timestamp'], str):
-                timestamp = datetime.fromisoformat(data['timestamp'].replace('Z', '+00:00'))
+            # Converter timestamp (epoch em milissegundos é interpretado como UTC)
+            raw_timestamp = data['timestamp']
+            if isinstance(raw_timestamp, str):
+                timestamp = parse_timestamp(raw_timestamp)
             else:
-                timestamp = datetime.fromtimestamp(data['timestamp'] / 1000)  # milissegundos
+                timestamp = datetime.fromtimestamp(raw_timestamp / 1000, timezone.utc)
             
-            # Criar objeto SensorReading
-            sensor_reading = SensorReading(
+            # Gravar direto no buffer colunar (sem objeto intermediário por leitura)
+            record = reading_record(
                 device_id=data['device_id'],
                 timestamp=timestamp,
                 location=data.get('location', 'Unknown'),
@@ -255,143 +503,200 @@ class DataIngestionService:
                 fault_detected=data.get('fault_detected', False)
             )
             
-            # Adicionar à fila de processamento
-            if not self.data_queue.full():
-                self.data_queue.put(sensor_reading)
-                self.logger.debug(f"Dados de {sensor_reading.device_id} adicionados à fila")
+            if self.data_buffer.append(record):
+                self.logger.debug("Dados de %s adicionados ao buffer", record[0])
             else:
-                self.logger.warning("Fila de dados cheia! Dados podem ser perdidos")
+                self.logger.warning("Buffer de dados cheio! Dados podem ser perdidos")
                 
         except json.JSONDecodeError as e:
             self.logger.error(f"Erro ao decodificar JSON: {str(e)}")
+        except ValueError as e:
+            self.logger.warning(f"Leitura descartada: {str(e)}")
         except Exception as e:
             self.logger.error(f"Erro ao processar dados de sensor: {str(e)}")
     
-    def process_heartbeat(self, payload: str):
+    def process_heartbeat(self, payload: bytes):
         """Processar heartbeat de dispositivos"""
         try:
-            data = json.loads(payload)
+            data = json_loads(payload)
             device_id = data.get('device_id', 'Unknown')
             self.logger.debug(f"Heartbeat recebido de {device_id}")
             # Aqui poderia atualizar status de conectividade dos dispositivos
         except Exception as e:
             self.logger.error(f"Erro ao processar heartbeat: {str(e)}")
     
-    def process_status_message(self, payload: str):
+    def process_status_message(self, payload: bytes):
         """Processar mensagens de status"""
         try:
-            data = json.loads(payload)
+            data = json_loads(payload)
             self.logger.info(f"Status recebido: {data}")
         except Exception as e:
             self.logger.error(f"Erro ao processar status: {str(e)}")
     
-    def insert_sensor_data(self, reading: SensorReading) -> bool:
-        """Inserir dados de sensor no banco de dados"""
+    def thread_connection(self):
+        """Conexão e cursor de inserção da thread atual (do pool, na primeira chamada)"""
+        state = self.thread_state
+        if getattr(state, 'connection', None) is None:
+            connection = self.db_pool.acquire()
+            connection.autocommit = False  # commit explícito, um por lote
+            # Cursor de inserção reaproveitado entre lotes (statement já preparado)
+            state.insert_cursor = connection.cursor()
+            state.connection = connection
+            with self.worker_connections_lock:
+                self.worker_connections.append(connection)
+        return state.connection, state.insert_cursor
+    
+    def batch_to_rows(self, batch: np.ndarray) -> List[tuple]:
+        """Converter lote do buffer em linhas de bind de T_MEDICAO (coluna a coluna)"""
+        # IDs de equipamento e sensor: uma consulta por dispositivo do lote
+        _, first, inverse = np.unique(batch['device_id'], return_index=True, return_inverse=True)
+        device_ids = [
+            self.get_or_create_device(
+                batch['device_id'][i], batch['equipment_type'][i], batch['location'][i]
+            )
+            for i in first
+        ]
+        equipment_ids = np.array([ids[0] for ids in device_ids], dtype=object)[inverse]
+        sensor_ids = np.array([ids[1] for ids in device_ids], dtype=object)[inverse]
+        
+        # Vibração total (NaN se algum componente faltar)
+        vibration = np.sqrt(batch['vibr_x'] ** 2 + batch['vibr_y'] ** 2 + batch['vibr_z'] ** 2)
+        
+        # Uma lista por coluna direto do array contíguo; NaN vira None (NULL no
+        # Oracle) só nas colunas que têm algum valor ausente
+        columns = []
+        for column in SENSOR_COLUMNS:
+            values = vibration if column == 'vibration' else batch[column]
+            missing = np.isnan(values)
+            if missing.any():
+                cells = values.astype(object)
+                cells[missing] = None
+                columns.append(cells.tolist())
+            else:
+                columns.append(values.tolist())
+        
+        return list(zip(
+            sensor_ids.tolist(),                             # id_sensor
+            equipment_ids.tolist(),                          # id_maquina
+            *columns,                                        # vl_temperatura ... vl_gyro_z
+            np.where(batch['fault'], 'S', 'N').tolist(),     # flag_falha
+            batch['source'].tolist()                         # fonte_dados
+        ))
+    
+    def insert_sensor_batch(self, batch: np.ndarray) -> int:
+        """Inserir lote do buffer com executemany (array DML); retorna nº de linhas inseridas"""
+        if not len(batch):
+            return 0
+        
+        connection = None
         try:
-            cursor = self.db_connection.cursor()
-            
-            # Determinar IDs de equipamento e sensor
-            equipment_id = self.get_or_create_equipment(reading)
-            sensor_id = self.get_or_create_sensor(reading)
+            connection, cursor = self.thread_connection()
+            rows = self.batch_to_rows(batch)
             
-            # Extrair valores dos sensores
-            sensors = reading.sensors
-            temperature = sensors.get('temperature', None)
-            temperature_dht = sensors.get('temperature_dht', None)
-            humidity = sensors.get('humidity', None)
-            pressure = sensors.get('pressure', None)
-            vibr_x = sensors.get('vibration_x', sensors.get('vibr_x', None))
-            vibr_y = sensors.get('vibration_y', sensors.get('vibr_y', None))
-            vibr_z = sensors.get('vibration_z', sensors.get('vibr_z', None))
-            gyro_x = sensors.get('gyro_x', None)
-            gyro_y = sensors.get('gyro_y', None)
-            gyro_z = sensors.get('gyro_z', None)
+            cursor.bindarraysize = len(rows)
+            # Colunas numéricas declaradas de antemão (NULL na primeira linha não
+            # muda o tipo do bind no meio do lote); textos são inferidos dos dados
+            cursor.setinputsizes(None, None, *([cx_Oracle.NUMBER] * 10), None, None)
+            cursor.executemany(INSERT_MEDICAO_SQL, rows, batcherrors=True)
             
-            # Calcular vibração total se componentes disponíveis
-            vibration_total = None
-            if all(v is not None for v in [vibr_x, vibr_y, vibr_z]):
-                vibration_total = (vibr_x**2 + vibr_y**2 + vibr_z**2)**0.5
+            # Linhas rejeitadas não derrubam o lote inteiro
+            errors = cursor.getbatcherrors()
+            for error in errors:
+                self.logger.error(f"Erro ao inserir linha {error.offset} do lote: {error.message}")
             
-            # Usar stored procedure para inserção
-            cursor.callproc('SP_INSERT_MEDICAO', [
-                sensor_id,                           # p_id_sensor
-                equipment_id,                        # p_id_maquina  
-                temperature,                         # p_temperatura
-                pressure,                           # p_pressao
-                vibration_total,                    # p_vibracao
-                humidity,                           # p_humidade
-                vibr_x,                            # p_vibr_x
-                vibr_y,                            # p_vibr_y
-                vibr_z,                            # p_vibr_z
-                gyro_x,                            # p_gyro_x
-                gyro_y,                            # p_gyro_y
-                gyro_z,                            # p_gyro_z
-                'S' if reading.fault_detected else 'N',  # p_flag_falha
-                reading.source                      # p_fonte
-            ])
+            connection.commit()
             
-            self.db_connection.commit()
-            self.stats.total_records += 1
-            self.stats.last_insert = datetime.now()
+            inserted = len(rows) - len(errors)
+            now = datetime.now()
+            with self.stats_lock:
+                self.roll_stats_day()
+                self.stats.total_records += inserted
+                self.stats.records_today += inserted
+                self.stats.failed_inserts += len(errors)
+                self.stats.last_insert = now
+                for equipment_id in {row[1] for row in rows}:
+                    self.equipment_last_seen[equipment_id] = now
             
-            self.logger.debug(f"Dados inseridos com sucesso para {reading.device_id}")
-            return True
+            self.logger.debug(f"Lote de {inserted} leituras inserido com sucesso")
+            return inserted
             
         except Exception as e:
-            self.logger.error(f"Erro ao inserir dados no banco: {str(e)}")
-            self.db_connection.rollback()
-            self.stats.failed_inserts += 1
+            self.logger.error(f"Erro ao inserir lote no banco: {str(e)}")
+            if connection is not None:
+                connection.rollback()
+            with self.stats_lock:
+                self.stats.failed_inserts += len(batch)
+            return 0
+    
+    def insert_sensor_data(self, reading: SensorReading) -> bool:
+        """Inserir dados de sensor no banco de dados"""
+        try:
+            record = reading_record(
+                reading.device_id, reading.timestamp, reading.location,
+                reading.equipment_type, reading.sensors, reading.fault_detected, reading.source
+            )
+        except ValueError as e:
+            self.logger.warning(f"Leitura descartada: {str(e)}")
             return False
+        return self.insert_sensor_batch(np.array([record], dtype=READING_DTYPE)) == 1
     
-    def get_or_create_equipment(self, reading: SensorReading) -> str:
-        """Obter ou criar equipamento"""
-        equipment_id = reading.device_id.replace('ESP32_', '').replace('_', '') + '_EQ'
+    def load_known_ids(self):
+        """Carregar IDs de equipamentos e sensores já cadastrados"""
+        with self.db_pool.acquire() as connection:
+            cursor = connection.cursor()
+            
+            cursor.execute("SELECT id_maquina FROM T_EQUIPAMENTO")
+            equipment = {sys.intern(row[0]) for row in cursor}
+            
+            cursor.execute("SELECT id_sensor FROM T_SENSOR")
+            sensors = {sys.intern(row[0]) for row in cursor}
+            
+            cursor.close()
         
-        cursor = self.db_connection.cursor()
+        with self.known_ids_lock:
+            self.known_equipment = equipment
+            self.known_sensors = sensors
         
-        # Verificar se equipamento existe
-        cursor.execute(
-            "SELECT COUNT(*) FROM T_EQUIPAMENTO WHERE id_maquina = :1",
-            [equipment_id]
+        self.logger.info(
+            f"Cache carregado: {len(equipment)} equipamentos, {len(sensors)} sensores"
         )
-        
-        if cursor.fetchone()[0] == 0:
-            # Criar equipamento
-            cursor.execute(
-                """INSERT INTO T_EQUIPAMENTO 
-                   (id_maquina, tipo_maquina, localizacao) 
-                   VALUES (:1, :2, :3)""",
-                [equipment_id, reading.equipment_type[:16], reading.location[:50]]
-            )
-            self.logger.info(f"Novo equipamento criado: {equipment_id}")
-        
-        cursor.close()
-        return equipment_id
     
-    def get_or_create_sensor(self, reading: SensorReading) -> str:
-        """Obter ou criar sensor"""
-        sensor_id = reading.device_id.replace('ESP32_', 'SENS_')
+    def get_or_create_device(self, device_id: str, equipment_type: str,
+                             location: str) -> Tuple[str, str]:
+        """Obter ou criar equipamento e sensor de um dispositivo"""
+        equipment_id, sensor_id = device_entity_ids(device_id)
         
-        cursor = self.db_connection.cursor()
+        if equipment_id in self.known_equipment and sensor_id in self.known_sensors:
+            return equipment_id, sensor_id
         
-        # Verificar se sensor existe  
+        connection, _ = self.thread_connection()
+        cursor = connection.cursor()
+        
+        # Equipamento e sensor criados em um único bloco PL/SQL (um round-trip)
+        new_equipment = cursor.var(int)
+        new_sensor = cursor.var(int)
         cursor.execute(
-            "SELECT COUNT(*) FROM T_SENSOR WHERE id_sensor = :1",
-            [sensor_id]
+            ENSURE_DEVICE_SQL,
+            id_maquina=equipment_id,
+            tipo_maquina=equipment_type[:16],
+            localizacao=location[:50],
+            id_sensor=sensor_id,
+            novo_equipamento=new_equipment,
+            novo_sensor=new_sensor
         )
-        
-        if cursor.fetchone()[0] == 0:
-            # Criar sensor
-            cursor.execute(
-                """INSERT INTO T_SENSOR 
-                   (id_sensor, tipo_sensor, unidade_medida) 
-                   VALUES (:1, :2, :3)""",
-                [sensor_id, 'ESP32_Multi', 'Mixed']
-            )
+        if new_equipment.getvalue():
+            self.logger.info(f"Novo equipamento criado: {equipment_id}")
+        if new_sensor.getvalue():
             self.logger.info(f"Novo sensor criado: {sensor_id}")
         
+        # Commit imediato: o cache só registra IDs que já existem de fato
+        connection.commit()
         cursor.close()
-        return sensor_id
+        
+        with self.known_ids_lock:
+            self.known_equipment.add(equipment_id)
+            self.known_sensors.add(sensor_id)
+        return equipment_id, sensor_id
     
     def data_processing_loop(self):
         """Loop principal de processamento de dados"""
@@ -399,36 +704,46 @@ class DataIngestionService:
         
         while self.is_running:
             try:
-                # Processar dados em lotes
-                batch = []
-                batch_size = SYSTEM_CONFIG['batch_insert_size']
+                # Bloquear até a primeira leitura (sem polling); o timeout só serve
+                # para reavaliar is_running na parada
+                if not self.data_buffer.wait(SYSTEM_CONFIG['processing_interval']):
+                    continue
                 
-                # Coletar dados da fila
-                while len(batch) < batch_size and not self.data_queue.empty():
-                    try:
-                        reading = self.data_queue.get(timeout=1)
-                        batch.append(reading)
-                    except:
-                        break
+                # Retirar tudo o que chegou (um único acesso ao lock)
+                pending = self.data_buffer.drain()
                 
-                # Inserir lote no banco de dados
-                if batch:
-                    successful_inserts = 0
-                    for reading in batch:
-                        if self.insert_sensor_data(reading):
-                            successful_inserts += 1
+                if len(pending):
+                    # Uma partição por trabalhador, agrupada por dispositivo: leituras do
+                    # mesmo dispositivo ficam na mesma thread e mantêm a ordem de chegada
+                    n_workers = SYSTEM_CONFIG['insert_workers']
+                    _, device_codes = np.unique(pending['device_id'], return_inverse=True)
+                    worker_of = device_codes.ravel() % n_workers
+                    futures = [
+                        self.insert_executor.submit(self.insert_partition, pending[worker_of == worker])
+                        for worker in range(n_workers)
+                        if (worker_of == worker).any()
+                    ]
                     
-                    self.logger.info(
-                        f"Lote processado: {successful_inserts}/{len(batch)} inserções bem-sucedidas"
-                    )
-                
-                # Aguardar próximo ciclo
-                time.sleep(SYSTEM_CONFIG['processing_interval'])
+                    # A view do buffer só é reaproveitada no próximo drain: aguardar todos
+                    for future in futures:
+                        future.result()
                 
             except Exception as e:
                 self.logger.error(f"Erro no loop de processamento: {str(e)}")
                 time.sleep(5)  # Esperar mais tempo em caso de erro
     
+    def insert_partition(self, partition: np.ndarray):
+        """Inserir partição de leituras em lotes de batch_insert_size (thread trabalhadora)"""
+        batch_size = SYSTEM_CONFIG['batch_insert_size']
+        
+        for start in range(0, len(partition), batch_size):
+            batch = partition[start:start + batch_size]
+            successful_inserts = self.insert_sensor_batch(batch)
+            
+            self.logger.info(
+                f"Lote processado: {successful_inserts}/{len(batch)} inserções bem-sucedidas"
+            )
+    
     def heartbeat_loop(self):
         """Loop de heartbeat e estatísticas"""
         self.logger.info("Iniciando loop de heartbeat")
@@ -441,7 +756,7 @@ class DataIngestionService:
                 # Log de status
                 self.logger.info(
                     f"Status: {self.stats.total_records} registros total, "
-                    f"{self.data_queue.qsize()} na fila, "
+                    f"{len(self.data_buffer)} no buffer, "
                     f"{self.stats.failed_inserts} falhas"
                 )
                 
@@ -452,31 +767,60 @@ class DataIngestionService:
                 self.logger.error(f"Erro no heartbeat: {str(e)}")
                 time.sleep(10)
     
+    def load_stats(self):
+        """Carregar os contadores a partir do banco (uma vez, na conexão)"""
+        with self.db_pool.acquire() as connection:
+            cursor = connection.cursor()
+            
+            # Total de registros
+            cursor.execute("SELECT COUNT(*) FROM T_MEDICAO")
+            total_records = cursor.fetchone()[0]
+            
+            # Registros de hoje
+            cursor.execute(
+                """SELECT COUNT(*) FROM T_MEDICAO 
+                   WHERE dataHora_medicao >= TRUNC(SYSDATE)"""
+            )
+            records_today = cursor.fetchone()[0]
+            
+            # Última leitura de cada equipamento ativo (últimas 24h)
+            cursor.execute(
+                """SELECT id_maquina, MAX(dataHora_medicao) FROM T_MEDICAO 
+                   WHERE dataHora_medicao >= SYSDATE - 1
+                   GROUP BY id_maquina"""
+            )
+            last_seen = dict(cursor)
+            
+            cursor.close()
+        
+        with self.stats_lock:
+            self.stats_day = date.today()
+            self.stats.total_records = total_records
+            self.stats.records_today = records_today
+            self.equipment_last_seen = last_seen
+            self.stats.active_devices = len(last_seen)
+    
+    def roll_stats_day(self):
+        """Zerar o contador diário na virada do dia (chamar com stats_lock)"""
+        today = date.today()
+        if today != self.stats_day:
+            self.stats_day = today
+            self.stats.records_today = 0
+    
     def update_stats(self):
-        """Atualizar estatísticas do sistema"""
+        """Atualizar estatísticas do sistema (em memória, sem consultar o banco)"""
         try:
-            if self.db_connection:
-                cursor = self.db_connection.cursor()
-                
-                # Total de registros
-                cursor.execute("SELECT COUNT(*) FROM T_MEDICAO")
-                self.stats.total_records = cursor.fetchone()[0]
+            cutoff = datetime.now() - timedelta(days=1)
+            with self.stats_lock:
+                self.roll_stats_day()
                 
-                # Registros de hoje
-                cursor.execute(
-                    """SELECT COUNT(*) FROM T_MEDICAO 
-                       WHERE dataHora_medicao >= TRUNC(SYSDATE)"""
-                )
-                self.stats.records_today = cursor.fetchone()[0]
-                
-                # Dispositivos ativos (últimas 24h)
-                cursor.execute(
-                    """SELECT COUNT(DISTINCT id_maquina) FROM T_MEDICAO 
-                       WHERE dataHora_medicao >= SYSDATE - 1"""
-                )
-                self.stats.active_devices = cursor.fetchone()[0]
-                
-                cursor.close()
+                # Dispositivos ativos: equipamentos com leitura nas últimas 24h
+                self.equipment_last_seen = {
+                    equipment_id: seen
+                    for equipment_id, seen in self.equipment_last_seen.items()
+                    if seen >= cutoff
+                }
+                self.stats.active_devices = len(self.equipment_last_seen)
                 
         except Exception as e:
             self.logger.error(f"Erro ao atualizar estatísticas: {str(e)}")
@@ -494,9 +838,18 @@ class DataIngestionService:
             self.logger.error("Falha ao conectar com MQTT. Abortando.")
             return False
         
+        # Objetos criados até aqui (módulos, pool, caches) vivem até o fim do
+        # serviço: congelados, saem das varreduras do coletor de ciclos
+        gc.freeze()
+        
         # Iniciar threads
         self.is_running = True
         
+        self.insert_executor = ThreadPoolExecutor(
+            max_workers=SYSTEM_CONFIG['insert_workers'],
+            thread_name_prefix='hermes_insert'
+        )
+        
         self.processing_thread = threading.Thread(target=self.data_processing_loop)
         self.processing_thread.start()
         
@@ -523,42 +876,68 @@ class DataIngestionService:
             self.mqtt_client.loop_stop()
             self.mqtt_client.disconnect()
         
-        if self.db_connection:
-            self.db_connection.close()
+        # Encerrar trabalhadores e devolver as sessões ao pool
+        if self.insert_executor:
+            self.insert_executor.shutdown(wait=True)
+        
+        if self.db_pool:
+            for connection in self.worker_connections:
+                self.db_pool.release(connection)
+            self.db_pool.close()
         
         self.logger.info("Serviço parado")
+        if self.log_listener:
+            self.log_listener.stop()
 
 # ===========================================
 # FUNCÕES UTILITÁRIAS
 # ===========================================
 
-def simulate_sensor_data():
-    """Função para simular dados de sensores (útil para testes)"""
-    import random
-    
-    sample_data = {
-        "device_id": "ESP32_HERMES_001",
-        "timestamp": datetime.now().isoformat(),
-        "location": "Factory_A",
-        "equipment_type": "Pump",
-        "sensors": {
-            "temperature": round(random.uniform(20, 100), 2),
-            "temperature_dht": round(random.uniform(20, 100), 2),
-            "humidity": round(random.uniform(30, 80), 1),
-            "pressure": round(random.uniform(950, 1050), 2),
-            "vibration_x": round(random.uniform(-10, 10), 2),
-            "vibration_y": round(random.uniform(-10, 10), 2),
-            "vibration_z": round(random.uniform(8, 12), 2),
-            "gyro_x": round(random.uniform(-5, 5), 2),
-            "gyro_y": round(random.uniform(-5, 5), 2),
-            "gyro_z": round(random.uniform(-1, 1), 2)
-        },
-        "fault_detected": random.choice([True, False]),
-        "avg_temp_5min": round(random.uniform(20, 100), 2),
-        "max_vibration_5min": round(random.uniform(5, 15), 2)
+# Faixas de simulação por campo: (mínimo, máximo, casas decimais)
+SIMULATED_SENSOR_RANGES = {
+    "temperature": (20, 100, 2),
+    "temperature_dht": (20, 100, 2),
+    "humidity": (30, 80, 1),
+    "pressure": (950, 1050, 2),
+    "vibration_x": (-10, 10, 2),
+    "vibration_y": (-10, 10, 2),
+    "vibration_z": (8, 12, 2),
+    "gyro_x": (-5, 5, 2),
+    "gyro_y": (-5, 5, 2),
+    "gyro_z": (-1, 1, 2)
+}
+
+def simulate_sensor_batch(n: int) -> List[str]:
+    """Simular n payloads de sensores de uma vez (valores gerados em lote com NumPy)"""
+    rng = np.random.default_rng()
+    
+    # Uma coluna por campo, já arredondada, convertida para float do Python
+    sensors = {
+        name: np.round(rng.uniform(low, high, n), decimals).tolist()
+        for name, (low, high, decimals) in SIMULATED_SENSOR_RANGES.items()
     }
+    fault_detected = rng.integers(0, 2, n).astype(bool).tolist()
+    avg_temp_5min = np.round(rng.uniform(20, 100, n), 2).tolist()
+    max_vibration_5min = np.round(rng.uniform(5, 15, n), 2).tolist()
+    timestamp = datetime.now().isoformat()
     
-    return json.dumps(sample_data)
+    return [
+        json_dumps({
+            "device_id": "ESP32_HERMES_001",
+            "timestamp": timestamp,
+            "location": "Factory_A",
+            "equipment_type": "Pump",
+            "sensors": {name: values[i] for name, values in sensors.items()},
+            "fault_detected": fault_detected[i],
+            "avg_temp_5min": avg_temp_5min[i],
+            "max_vibration_5min": max_vibration_5min[i]
+        })
+        for i in range(n)
+    ]
+
+def simulate_sensor_data():
+    """Função para simular dados de sensores (útil para testes)"""
+    return simulate_sensor_batch(1)[0]
 
 # ===========================================
 # MAIN - EXECUÇÃO PRINCIPAL
@@ -95,6 +95,13 @@ CREATE INDEX IDX_MEDICAO_FALHA ON T_MEDICAO (flag_falha);
 -- Índice para consultas recentes (últimas 24h, 7 dias, etc)
 CREATE INDEX IDX_MEDICAO_TEMPO ON T_MEDICAO (dataHora_medicao);
 
+-- Índice de cobertura para o dashboard (janela por tempo + colunas lidas),
+-- evita full scan e acesso à tabela nas consultas agregadas
+CREATE INDEX IDX_MEDICAO_TEMPO_COBERTURA ON T_MEDICAO (
+    dataHora_medicao, id_maquina, vl_temperatura, vl_pressao,
+    vl_humidade, vl_vibracao, flag_falha
+);
+
 -- =====================================================
 -- 5. SEQUÊNCIA PARA IDs AUTOMÁTICOS
 -- =====================================================
@@ -34,7 +34,28 @@ import pickle
 # Data processing
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine, text
+import cx_Oracle
+from sqlalchemy import DateTime, bindparam, create_engine, event, text
+
+# python-oracledb (opcional, 3.0+): sucessor do cx_Oracle; com ele as extrações chegam
+# em lotes Arrow direto dos buffers do driver, sem tupla Python por linha
+try:
+    import oracledb
+    import pyarrow as pa
+    ORACLEDB_ARROW_AVAILABLE = hasattr(oracledb.Connection, 'fetch_df_batches')
+except ImportError:
+    ORACLEDB_ARROW_AVAILABLE = False
+
+# Numba (opcional): sem ele os kernels usam a implementação NumPy equivalente
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Driver/dialeto do engine: oracledb (modo thin, mesmo DSN) quando disponível
+ORACLE_DRIVER = oracledb if ORACLEDB_ARROW_AVAILABLE else cx_Oracle
+ORACLE_DIALECT = 'oracledb' if ORACLEDB_ARROW_AVAILABLE else 'cx_oracle'
 
 # Nossos módulos
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -54,8 +75,18 @@ PIPELINE_CONFIG = {
     'max_workers': 4,
     'retry_attempts': 3,
     'retry_delay': 5,  # segundos
+    'fetch_arraysize': 10000,  # linhas por round-trip nas extrações (ajustar ao SDU da rede)
+    'fetch_chunksize': 50000,  # linhas materializadas por vez na extração histórica
+    'load_chunksize': 5000,  # linhas por executemany na carga de agregações
+    'stmt_cache_size': 50,  # statements preparados mantidos por conexão Oracle
 }
 
+# Colunas de sensores de T_MEDICAO, mantidas em float32 após a extração
+SENSOR_VALUE_COLUMNS = [
+    'VL_TEMPERATURA', 'VL_PRESSAO', 'VL_VIBRACAO', 'VL_HUMIDADE',
+    'VL_VIBR_X', 'VL_VIBR_Y', 'VL_VIBR_Z', 'VL_GYRO_X', 'VL_GYRO_Y', 'VL_GYRO_Z'
+]
+
 # Database Configuration
 DB_CONFIG = {
     'user': 'your_db_user',
@@ -64,6 +95,64 @@ DB_CONFIG = {
     'encoding': 'UTF-8'
 }
 
+# Consultas montadas uma única vez: o texto idêntico a cada ciclo é reaproveitado
+# pelo cache de statements do driver (stmt_cache_size) sem novo parse no Oracle.
+# Janela de tempo via NUMTODSINTERVAL: literal INTERVAL não aceita bind variable
+EXTRACT_SENSOR_SQL = """
+    SELECT
+        m.id_medicao,
+        m.id_maquina,
+        m.id_sensor,
+        m.dataHora_medicao,
+        m.vl_temperatura,
+        m.vl_pressao,
+        m.vl_vibracao,
+        m.vl_humidade,
+        m.vl_vibr_x,
+        m.vl_vibr_y,
+        m.vl_vibr_z,
+        m.vl_gyro_x,
+        m.vl_gyro_y,
+        m.vl_gyro_z,
+        m.flag_falha,
+        m.fonte_dados,
+        e.tipo_maquina,
+        e.localizacao,
+        e.status_operacional
+    FROM T_MEDICAO m
+    INNER JOIN T_EQUIPAMENTO e ON m.id_maquina = e.id_maquina
+    WHERE m.dataHora_medicao >= SYSTIMESTAMP - NUMTODSINTERVAL(:hours, 'HOUR')
+    ORDER BY m.dataHora_medicao DESC
+"""
+
+# Só as colunas usadas no treino (sem IDs de medição/sensor, fonte ou
+# dados cadastrais do equipamento): menos bytes na rede e no DataFrame
+EXTRACT_HISTORICAL_SQL = """
+    SELECT
+        m.id_maquina,
+        m.dataHora_medicao,
+        m.vl_temperatura,
+        m.vl_pressao,
+        m.vl_vibracao,
+        m.vl_humidade,
+        m.vl_vibr_x,
+        m.vl_vibr_y,
+        m.vl_vibr_z,
+        m.vl_gyro_x,
+        m.vl_gyro_y,
+        m.vl_gyro_z,
+        m.flag_falha
+    FROM T_MEDICAO m
+    WHERE m.dataHora_medicao >= SYSTIMESTAMP - NUMTODSINTERVAL(:days, 'DAY')
+"""
+
+PING_SQL = text("SELECT 1 FROM DUAL")
+
+CLEANUP_AGGREGATES_SQL = text("""
+    DELETE FROM T_AGG_EQUIPMENT_SUMMARY
+    WHERE created_date < :cutoff_date
+""").bindparams(bindparam('cutoff_date', type_=DateTime))
+
 # Paths
 BASE_PATH = Path(__file__).parent
 LOGS_PATH = BASE_PATH / 'logs'
@@ -75,6 +164,45 @@ REPORTS_PATH = BASE_PATH / 'reports'
 for path in [LOGS_PATH, MODELS_PATH, DATA_PATH, REPORTS_PATH]:
     path.mkdir(exist_ok=True)
 
+# ===========================================
+# KERNELS NUMÉRICOS
+# ===========================================
+
+# Faixas de TEMP_STATUS (limites superiores inclusivos, como no pd.cut)
+TEMP_STATUS_LABELS = ['NORMAL', 'WARNING', 'CRITICAL']
+TEMP_STATUS_BINS = np.array([85.0, 95.0])
+
+if NUMBA_AVAILABLE:
+    @njit(nogil=True, cache=True)
+    def _derive_features(vibr_x, vibr_y, vibr_z, temperature, magnitude, status):
+        """Passada única sobre as leituras: magnitude da vibração e código de faixa
+        de temperatura (0 = NORMAL, 1 = WARNING, 2 = CRITICAL, -1 = nulo); arrays
+        vazios desligam a feature correspondente"""
+        n = max(vibr_x.shape[0], temperature.shape[0])
+        for i in range(n):
+            if i < vibr_x.shape[0]:
+                magnitude[i] = np.sqrt(
+                    vibr_x[i] * vibr_x[i] + vibr_y[i] * vibr_y[i] + vibr_z[i] * vibr_z[i]
+                )
+            if i < temperature.shape[0]:
+                t = temperature[i]
+                if np.isnan(t):
+                    status[i] = -1
+                elif t <= 85.0:
+                    status[i] = 0
+                elif t <= 95.0:
+                    status[i] = 1
+                else:
+                    status[i] = 2
+else:
+    def _derive_features(vibr_x, vibr_y, vibr_z, temperature, magnitude, status):
+        """Equivalente NumPy de _derive_features (uma operação por feature)"""
+        if vibr_x.shape[0]:
+            magnitude[:] = np.sqrt(vibr_x * vibr_x + vibr_y * vibr_y + vibr_z * vibr_z)
+        if temperature.shape[0]:
+            status[:] = np.searchsorted(TEMP_STATUS_BINS, temperature, side='left')
+            status[np.isnan(temperature)] = -1
+
 # ===========================================
 # ESTRUTURAS DE DADOS
 # ===========================================
@@ -123,7 +251,8 @@ class SmartMaintenanceETLPipeline:
         self.metrics = PipelineMetrics()
         self.data_quality_checks = []
         
-        # Threading
+        # Threading (executor só para estágios de I/O: banco e arquivos; o trabalho
+        # pandas/NumPy já é vetorizado e roda na thread do ciclo)
         self.executor = ThreadPoolExecutor(max_workers=PIPELINE_CONFIG['max_workers'])
         self.processing_thread = None
         self.monitoring_thread = None
@@ -143,21 +272,30 @@ class SmartMaintenanceETLPipeline:
             ]
         )
     
+    def configure_oracle_connection(self, dbapi_connection, connection_record):
+        """Ajustar cada conexão física nova do pool (cache de statements do driver)"""
+        dbapi_connection.stmtcachesize = PIPELINE_CONFIG['stmt_cache_size']
+    
     def connect_database(self) -> bool:
         """Conectar ao banco de dados"""
         try:
-            connection_string = f"oracle+cx_oracle://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['dsn']}"
+            connection_string = f"oracle+{ORACLE_DIALECT}://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['dsn']}"
             self.db_engine = create_engine(
                 connection_string,
                 pool_size=10,
                 max_overflow=20,
                 pool_pre_ping=True,
-                pool_recycle=3600
+                pool_recycle=1800,
+                # LIFO: reusa sempre as conexões mais recentes (caches de cursor
+                # quentes no servidor); as ociosas expiram pelo pool_recycle
+                pool_use_lifo=True,
+                arraysize=PIPELINE_CONFIG['fetch_arraysize']
             )
+            event.listen(self.db_engine, 'connect', self.configure_oracle_connection)
             
             # Testar conexão
             with self.db_engine.connect() as conn:
-                conn.execute(text("SELECT 1 FROM DUAL"))
+                conn.execute(PING_SQL)
             
             self.logger.info("Conexão com banco de dados estabelecida")
             return True
@@ -170,6 +308,76 @@ class SmartMaintenanceETLPipeline:
     # EXTRACT - Extração de Dados
     # ===========================================
     
+    def fetch_dataframe(self, query: str, params: Dict[str, Any],
+                        chunksize: Optional[int] = None) -> pd.DataFrame:
+        """Executar consulta direto no cursor cx_Oracle, com arraysize/prefetchrows ajustados"""
+        if ORACLEDB_ARROW_AVAILABLE:
+            return self.fetch_arrow_dataframe(query, params, chunksize)
+        
+        connection = self.db_engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            # Definidos antes do execute: prefetch de arraysize + 1 evita um
+            # round-trip extra só para descobrir o fim do resultado
+            cursor.arraysize = PIPELINE_CONFIG['fetch_arraysize']
+            cursor.prefetchrows = PIPELINE_CONFIG['fetch_arraysize'] + 1
+            cursor.execute(query, params)
+            
+            columns = [column[0] for column in cursor.description]
+            if chunksize is None:
+                chunks = [pd.DataFrame.from_records(cursor.fetchall(), columns=columns)]
+            else:
+                # Resultado lido em blocos: só um bloco de tuplas em memória por vez,
+                # o resto já convertido em colunas do DataFrame
+                chunks = []
+                while True:
+                    rows = cursor.fetchmany(chunksize)
+                    if not rows:
+                        break
+                    chunks.append(pd.DataFrame.from_records(rows, columns=columns))
+            cursor.close()
+        finally:
+            connection.close()  # devolve a conexão ao pool do engine
+        
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+    
+    def fetch_arrow_dataframe(self, query: str, params: Dict[str, Any],
+                              chunksize: Optional[int] = None) -> pd.DataFrame:
+        """Executar consulta com python-oracledb, lendo o resultado em lotes Arrow"""
+        connection = self.db_engine.raw_connection()
+        try:
+            batches = [
+                pa.Table.from_arrays(batch.column_arrays(), names=batch.column_names())
+                for batch in connection.driver_connection.fetch_df_batches(
+                    query, params, size=chunksize or PIPELINE_CONFIG['fetch_arraysize']
+                )
+            ]
+        finally:
+            connection.close()  # devolve a conexão ao pool do engine
+        
+        if not batches:
+            return pd.DataFrame()
+        # Lotes Arrow liberados à medida que viram colunas do DataFrame
+        return pa.concat_tables(batches).to_pandas(split_blocks=True, self_destruct=True)
+    
+    def downcast_sensor_values(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converter colunas de sensores para float32 (metade da memória nas etapas seguintes)"""
+        columns = [column for column in SENSOR_VALUE_COLUMNS if column in df.columns]
+        if columns:
+            df[columns] = df[columns].astype(np.float32)
+        return df
+    
+    def round_aggregate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Arredondar agregação em float64 (médias de colunas float32 saem com 2 casas exatas)"""
+        float32_columns = frame.columns[(frame.dtypes == np.float32).to_numpy()]
+        if len(float32_columns):
+            frame[float32_columns] = frame[float32_columns].astype(np.float64)
+        return frame.round(2)
+    
     def extract_sensor_data(self, hours_back: int = 1) -> pd.DataFrame:
         """
         Extrair dados de sensores do banco
@@ -181,34 +389,9 @@ class SmartMaintenanceETLPipeline:
             DataFrame com dados dos sensores
         """
         try:
-            query = """
-            SELECT 
-                m.id_medicao,
-                m.id_maquina,
-                m.id_sensor,
-                m.dataHora_medicao,
-                m.vl_temperatura,
-                m.vl_pressao,
-                m.vl_vibracao,
-                m.vl_humidade,
-                m.vl_vibr_x,
-                m.vl_vibr_y,
-                m.vl_vibr_z,
-                m.vl_gyro_x,
-                m.vl_gyro_y,
-                m.vl_gyro_z,
-                m.flag_falha,
-                m.fonte_dados,
-                e.tipo_maquina,
-                e.localizacao,
-                e.status_operacional
-            FROM T_MEDICAO m
-            INNER JOIN T_EQUIPAMENTO e ON m.id_maquina = e.id_maquina
-            WHERE m.dataHora_medicao >= SYSTIMESTAMP - INTERVAL :hours HOUR
-            ORDER BY m.dataHora_medicao DESC
-            """
-            
-            df = pd.read_sql(query, self.db_engine, params={'hours': hours_back})
+            df = self.downcast_sensor_values(
+                self.fetch_dataframe(EXTRACT_SENSOR_SQL, {'hours': hours_back})
+            )
             
             self.logger.info(f"Extraídos {len(df)} registros das últimas {hours_back} horas")
             return df
@@ -220,17 +403,10 @@ class SmartMaintenanceETLPipeline:
     def extract_historical_data(self, days_back: int = 30) -> pd.DataFrame:
         """Extrair dados históricos para análise e ML"""
         try:
-            query = """
-            SELECT 
-                m.*,
-                e.tipo_maquina,
-                e.localizacao
-            FROM T_MEDICAO m
-            INNER JOIN T_EQUIPAMENTO e ON m.id_maquina = e.id_maquina
-            WHERE m.dataHora_medicao >= SYSTIMESTAMP - INTERVAL :days DAY
-            """
-            
-            df = pd.read_sql(query, self.db_engine, params={'days': days_back})
+            df = self.downcast_sensor_values(self.fetch_dataframe(
+                EXTRACT_HISTORICAL_SQL, {'days': days_back},
+                chunksize=PIPELINE_CONFIG['fetch_chunksize']
+            ))
             
             self.logger.info(f"Extraídos {len(df)} registros históricos dos últimos {days_back} dias")
             return df
@@ -249,8 +425,8 @@ class SmartMaintenanceETLPipeline:
         timestamp = datetime.now()
         
         try:
-            # Check 1: Valores nulos
-            null_count = df.isnull().sum().sum()
+            # Check 1: Valores nulos (uma passada sobre a matriz de máscaras)
+            null_count = int(df.isna().to_numpy().sum())
             checks.append(DataQualityCheck(
                 check_name="NULL_VALUES",
                 passed=null_count < len(df) * 0.1,  # Menos de 10% de nulls
@@ -261,9 +437,9 @@ class SmartMaintenanceETLPipeline:
             
             # Check 2: Valores fora do range esperado
             if 'VL_TEMPERATURA' in df.columns:
-                temp_outliers = df[
-                    (df['VL_TEMPERATURA'] < -50) | (df['VL_TEMPERATURA'] > 200)
-                ].shape[0]
+                # Contagem direto na máscara, sem montar o DataFrame filtrado
+                temperature = df['VL_TEMPERATURA'].to_numpy(dtype=float, na_value=np.nan)
+                temp_outliers = int(((temperature < -50) | (temperature > 200)).sum())
                 
                 checks.append(DataQualityCheck(
                     check_name="TEMPERATURE_RANGE",
@@ -275,7 +451,7 @@ class SmartMaintenanceETLPipeline:
             
             # Check 3: Duplicatas
             if 'ID_MEDICAO' in df.columns:
-                duplicates = df['ID_MEDICAO'].duplicated().sum()
+                duplicates = int(df['ID_MEDICAO'].duplicated().sum())
                 checks.append(DataQualityCheck(
                     check_name="DUPLICATES",
                     passed=duplicates == 0,
@@ -286,8 +462,9 @@ class SmartMaintenanceETLPipeline:
             
             # Check 4: Timestamps futuros
             if 'DATAHORA_MEDICAO' in df.columns:
-                df['DATAHORA_MEDICAO'] = pd.to_datetime(df['DATAHORA_MEDICAO'])
-                future_records = df[df['DATAHORA_MEDICAO'] > datetime.now()].shape[0]
+                # Conversão local: o DataFrame de entrada não é alterado pelo check
+                measured_at = pd.to_datetime(df['DATAHORA_MEDICAO'])
+                future_records = int((measured_at > datetime.now()).sum())
                 
                 checks.append(DataQualityCheck(
                     check_name="FUTURE_TIMESTAMPS",
@@ -318,65 +495,61 @@ class SmartMaintenanceETLPipeline:
         return checks
     
     def clean_and_transform_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Limpeza e transformação dos dados"""
+        """Limpeza e transformação dos dados (altera o DataFrame recebido)"""
         try:
             self.logger.info("Iniciando limpeza e transformação de dados")
             
             if df.empty:
                 return df
             
-            # Fazer cópia para não alterar o original
-            df_clean = df.copy()
+            # Sem cópia: o chamador entrega o DataFrame bruto e não o usa depois
+            df_clean = df
             
-            # 1. Tratar valores nulos
+            # 1. Tratar valores nulos (um único fillna com o valor de cada coluna)
             numeric_columns = df_clean.select_dtypes(include=[np.number]).columns
-            for col in numeric_columns:
-                if df_clean[col].isnull().sum() > 0:
-                    # Usar mediana para valores extremos, média para distribuições normais
-                    if col in ['VL_TEMPERATURA', 'VL_PRESSAO', 'VL_HUMIDADE']:
-                        df_clean[col] = df_clean[col].fillna(df_clean[col].median())
-                    else:
-                        df_clean[col] = df_clean[col].fillna(0)
-            
-            # 2. Remover outliers extremos (usando IQR)
-            for col in ['VL_TEMPERATURA', 'VL_PRESSAO', 'VL_VIBRACAO']:
-                if col in df_clean.columns:
-                    Q1 = df_clean[col].quantile(0.25)
-                    Q3 = df_clean[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    
-                    # Definir limites para outliers (mais conservador)
-                    lower_bound = Q1 - 3 * IQR
-                    upper_bound = Q3 + 3 * IQR
-                    
+            null_columns = numeric_columns[df_clean[numeric_columns].isna().any().to_numpy()]
+            if len(null_columns):
+                # Usar mediana para valores extremos, média para distribuições normais
+                median_columns = null_columns.intersection(['VL_TEMPERATURA', 'VL_PRESSAO', 'VL_HUMIDADE'])
+                fill_values = dict.fromkeys(null_columns, 0)
+                fill_values.update(df_clean[median_columns].median())
+                df_clean = df_clean.fillna(fill_values)
+            
+            # 2. Remover outliers extremos (usando IQR); quartis de todas as colunas de uma vez
+            outlier_columns = [
+                col for col in ['VL_TEMPERATURA', 'VL_PRESSAO', 'VL_VIBRACAO'] if col in df_clean.columns
+            ]
+            if outlier_columns:
+                quartiles = df_clean[outlier_columns].quantile([0.25, 0.75])
+                Q1, Q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+                IQR = Q3 - Q1
+                
+                # Definir limites para outliers (mais conservador)
+                lower_bounds = Q1 - 3 * IQR
+                upper_bounds = Q3 + 3 * IQR
+                
+                for col in outlier_columns:
+                    values = df_clean[col]
                     # Contar outliers removidos
-                    outliers_count = ((df_clean[col] < lower_bound) | (df_clean[col] > upper_bound)).sum()
+                    outliers_count = ((values < lower_bounds[col]) | (values > upper_bounds[col])).sum()
                     
                     if outliers_count > 0:
                         self.logger.info(f"Removendo {outliers_count} outliers de {col}")
-                        # Substituir outliers pelos valores dos limites
-                        df_clean[col] = np.clip(df_clean[col], lower_bound, upper_bound)
+                        # Substituir outliers pelos valores dos limites; limites no dtype
+                        # da coluna (float32 continua float32 após o clip)
+                        bounds_dtype = np.result_type(values.dtype, np.float32)
+                        lower, upper = np.array(
+                            [lower_bounds[col], upper_bounds[col]], dtype=bounds_dtype
+                        )
+                        df_clean[col] = np.clip(values, lower, upper)
             
             # 3. Padronizar timestamps
             if 'DATAHORA_MEDICAO' in df_clean.columns:
                 df_clean['DATAHORA_MEDICAO'] = pd.to_datetime(df_clean['DATAHORA_MEDICAO'])
             
-            # 4. Criar features derivadas
-            # Magnitude da vibração total
-            if all(col in df_clean.columns for col in ['VL_VIBR_X', 'VL_VIBR_Y', 'VL_VIBR_Z']):
-                df_clean['VIBRACAO_MAGNITUDE'] = np.sqrt(
-                    df_clean['VL_VIBR_X']**2 + 
-                    df_clean['VL_VIBR_Y']**2 + 
-                    df_clean['VL_VIBR_Z']**2
-                )
-            
-            # Status de saúde baseado em thresholds
-            if 'VL_TEMPERATURA' in df_clean.columns:
-                df_clean['TEMP_STATUS'] = pd.cut(
-                    df_clean['VL_TEMPERATURA'],
-                    bins=[-np.inf, 85, 95, np.inf],
-                    labels=['NORMAL', 'WARNING', 'CRITICAL']
-                )
+            # 4. Criar features derivadas (magnitude da vibração total e status de
+            # saúde por thresholds de temperatura) em uma única passada
+            self.derive_features(df_clean)
             
             # 5. Ordenar por timestamp
             if 'DATAHORA_MEDICAO' in df_clean.columns:
@@ -389,6 +562,41 @@ class SmartMaintenanceETLPipeline:
             self.logger.error(f"Erro na transformação de dados: {str(e)}")
             return df
     
+    def derive_features(self, df: pd.DataFrame) -> None:
+        """Adicionar VIBRACAO_MAGNITUDE e TEMP_STATUS ao DataFrame"""
+        vibration_columns = ['VL_VIBR_X', 'VL_VIBR_Y', 'VL_VIBR_Z']
+        has_vibration = all(col in df.columns for col in vibration_columns)
+        has_temperature = 'VL_TEMPERATURA' in df.columns
+        if not (has_vibration or has_temperature):
+            return
+        
+        n = len(df)
+        if has_vibration:
+            # float32 se todos os eixos forem float32 (como após a extração)
+            dtype = np.result_type(np.float32, *(df[col].dtype for col in vibration_columns))
+            if dtype != np.float32:
+                dtype = np.float64
+            vibration = [df[col].to_numpy(dtype=dtype, na_value=np.nan) for col in vibration_columns]
+        else:
+            dtype = np.float64
+            vibration = [np.empty(0)] * 3
+        temperature = (
+            df['VL_TEMPERATURA'].to_numpy(dtype=np.float64, na_value=np.nan)
+            if has_temperature else np.empty(0)
+        )
+        
+        magnitude = np.empty(n if has_vibration else 0, dtype=dtype)
+        status = np.empty(n if has_temperature else 0, dtype=np.int8)
+        _derive_features(*vibration, temperature, magnitude, status)
+        
+        if has_vibration:
+            df['VIBRACAO_MAGNITUDE'] = magnitude
+        if has_temperature:
+            # Categórico montado direto dos códigos (-1 vira nulo), como o pd.cut
+            df['TEMP_STATUS'] = pd.Categorical.from_codes(
+                status, categories=TEMP_STATUS_LABELS, ordered=True
+            )
+    
     def aggregate_data_for_reporting(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         """Criar agregações para relatórios e dashboard"""
         try:
@@ -397,16 +605,22 @@ class SmartMaintenanceETLPipeline:
             if df.empty:
                 return aggregations
             
+            # Falhas como 0/1 (comparação feita uma vez, no array): os groupby abaixo
+            # somam a coluna no caminho vetorizado, sem lambda por grupo
+            flagged = df
+            if 'FLAG_FALHA' in df.columns:
+                flagged = df.assign(FLAG_FALHA=(df['FLAG_FALHA'].to_numpy() == 'S').astype(np.int64))
+            
             # Agregação por equipamento (últimas 24h)
             if 'ID_MAQUINA' in df.columns:
-                equipment_agg = df.groupby('ID_MAQUINA').agg({
+                equipment_agg = self.round_aggregate(flagged.groupby('ID_MAQUINA').agg({
                     'VL_TEMPERATURA': ['mean', 'max', 'min', 'std'],
                     'VL_PRESSAO': ['mean', 'max', 'min'],
                     'VL_HUMIDADE': ['mean', 'max'],
                     'VL_VIBRACAO': ['mean', 'max'],
-                    'FLAG_FALHA': lambda x: (x == 'S').sum(),
+                    'FLAG_FALHA': 'sum',
                     'DATAHORA_MEDICAO': ['count', 'max']
-                }).round(2)
+                }))
                 
                 # Flatten column names
                 equipment_agg.columns = ['_'.join(col).strip() for col in equipment_agg.columns.values]
@@ -418,25 +632,25 @@ class SmartMaintenanceETLPipeline:
             if 'DATAHORA_MEDICAO' in df.columns:
                 df['hour'] = pd.to_datetime(df['DATAHORA_MEDICAO']).dt.floor('H')
                 
-                hourly_agg = df.groupby('hour').agg({
+                hourly_agg = self.round_aggregate(flagged.groupby(df['hour']).agg({
                     'VL_TEMPERATURA': 'mean',
                     'VL_PRESSAO': 'mean',
                     'VL_HUMIDADE': 'mean',
                     'VL_VIBRACAO': 'mean',
-                    'FLAG_FALHA': lambda x: (x == 'S').sum(),
+                    'FLAG_FALHA': 'sum',
                     'ID_MEDICAO': 'count'
-                }).round(2)
+                }))
                 
                 hourly_agg = hourly_agg.reset_index()
                 aggregations['hourly_trends'] = hourly_agg
             
             # Agregação por localização e tipo
             if all(col in df.columns for col in ['LOCALIZACAO', 'TIPO_MAQUINA']):
-                location_type_agg = df.groupby(['LOCALIZACAO', 'TIPO_MAQUINA']).agg({
+                location_type_agg = self.round_aggregate(flagged.groupby(['LOCALIZACAO', 'TIPO_MAQUINA']).agg({
                     'VL_TEMPERATURA': 'mean',
-                    'FLAG_FALHA': lambda x: (x == 'S').sum(),
+                    'FLAG_FALHA': 'sum',
                     'ID_MAQUINA': 'nunique'
-                }).round(2)
+                }))
                 
                 location_type_agg = location_type_agg.reset_index()
                 aggregations['location_type_summary'] = location_type_agg
@@ -452,6 +666,51 @@ class SmartMaintenanceETLPipeline:
     # LOAD - Carga de Dados
     # ===========================================
     
+    def insert_dataframe(self, table: str, df: pd.DataFrame) -> int:
+        """Inserir DataFrame com executemany em blocos (array DML); retorna nº de linhas"""
+        # Nomes citados como o to_sql citou ao criar a tabela
+        quote = self.db_engine.dialect.identifier_preparer.quote
+        columns = ', '.join(quote(column) for column in df.columns)
+        binds = ', '.join(f":{position}" for position in range(1, len(df.columns) + 1))
+        sql = f"INSERT INTO {quote(table)} ({columns}) VALUES ({binds})"
+        
+        # Tipos de bind pelos dtypes (NULL no início do bloco não muda o tipo)
+        input_sizes = [
+            ORACLE_DRIVER.NUMBER if pd.api.types.is_numeric_dtype(dtype)
+            else ORACLE_DRIVER.TIMESTAMP if pd.api.types.is_datetime64_any_dtype(dtype)
+            else None
+            for dtype in df.dtypes
+        ]
+        
+        # Valores nativos do Python; NaN/NaT viram None (NULL)
+        rows = df.astype(object).where(df.notna(), None).to_numpy().tolist()
+        
+        chunksize = PIPELINE_CONFIG['load_chunksize']
+        inserted = 0
+        connection = self.db_engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            for start in range(0, len(rows), chunksize):
+                chunk = rows[start:start + chunksize]
+                cursor.setinputsizes(*input_sizes)
+                cursor.executemany(sql, chunk, batcherrors=True)
+                
+                errors = cursor.getbatcherrors()
+                for error in errors:
+                    self.logger.error(
+                        f"Erro ao inserir linha {start + error.offset} em {table}: {error.message}"
+                    )
+                inserted += len(chunk) - len(errors)
+            cursor.close()
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()  # devolve a conexão ao pool do engine
+        
+        return inserted
+    
     def load_aggregated_data(self, aggregations: Dict[str, pd.DataFrame]) -> bool:
         """Carregar dados agregados em tabelas auxiliares"""
         try:
@@ -462,16 +721,19 @@ class SmartMaintenanceETLPipeline:
                     # Nome da tabela temporária
                     temp_table = f"T_AGG_{table_name.upper()}"
                     
-                    # Carregar para o banco
-                    df.to_sql(
+                    # Recriar só a estrutura (DDL do to_sql, sem linhas) e carregar
+                    # os dados com array DML
+                    df.head(0).to_sql(
                         temp_table,
                         self.db_engine,
                         if_exists='replace',
-                        index=False,
-                        chunksize=1000
+                        index=False
                     )
+                    inserted = self.insert_dataframe(temp_table, df)
                     
-                    self.logger.info(f"Agregação {table_name} carregada na tabela {temp_table}")
+                    self.logger.info(
+                        f"Agregação {table_name} carregada na tabela {temp_table} ({inserted} linhas)"
+                    )
                     
                 except Exception as e:
                     self.logger.error(f"Erro ao carregar agregação {table_name}: {str(e)}")
@@ -484,21 +746,21 @@ class SmartMaintenanceETLPipeline:
             return False
     
     def export_data_to_files(self, df: pd.DataFrame, aggregations: Dict[str, pd.DataFrame]) -> bool:
-        """Exportar dados para arquivos (backup e análise externa)"""
+        """Exportar dados para arquivos parquet (backup e análise externa)"""
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             # Exportar dados principais
             if not df.empty:
-                main_file = DATA_PATH / f"sensor_data_{timestamp}.csv"
-                df.to_csv(main_file, index=False)
+                main_file = DATA_PATH / f"sensor_data_{timestamp}.parquet"
+                df.to_parquet(main_file, engine='pyarrow', compression='snappy', index=False)
                 self.logger.info(f"Dados principais exportados para {main_file}")
             
             # Exportar agregações
             for name, agg_df in aggregations.items():
                 if not agg_df.empty:
-                    agg_file = DATA_PATH / f"{name}_{timestamp}.csv"
-                    agg_df.to_csv(agg_file, index=False)
+                    agg_file = DATA_PATH / f"{name}_{timestamp}.parquet"
+                    agg_df.to_parquet(agg_file, engine='pyarrow', compression='snappy', index=False)
                     self.logger.info(f"Agregação {name} exportada para {agg_file}")
             
             return True
@@ -523,51 +785,40 @@ class SmartMaintenanceETLPipeline:
             if not self.ml_pipeline.connect_database():
                 self.logger.warning("ML pipeline sem conexão DB, usando dados do DataFrame")
             
-            predictions = []
+            # Última leitura de cada equipamento, na ordem em que aparecem (uma passada,
+            # sem filtrar o DataFrame inteiro por ID)
+            equipment_ids = df['ID_MAQUINA'].dropna().unique()
+            latest = df.drop_duplicates('ID_MAQUINA', keep='last').set_index('ID_MAQUINA').loc[equipment_ids]
+            
+            def sensor_values(column: str) -> np.ndarray:
+                if column in latest.columns:
+                    return latest[column].to_numpy(dtype=float, na_value=np.nan)
+                return np.zeros(len(latest))
+            
+            # Fazer predição (simulada por enquanto)
+            # result = self.ml_pipeline.predict_maintenance(equipment_id, sensor_data)
+            
+            # Simular resultado para todos os equipamentos de uma vez; risco
+            # indefinido (leitura nula) conta como 0
+            risk_scores = (
+                (sensor_values('VL_TEMPERATURA') - 70) / 30 +
+                (sensor_values('VL_VIBRACAO') - 2) / 8 +
+                np.random.normal(0, 0.1, len(latest))
+            )
+            risk_scores = np.where(np.isnan(risk_scores), 0.0, np.clip(risk_scores, 0.0, 1.0))
+            
+            predictions_df = pd.DataFrame({
+                'equipment_id': equipment_ids,
+                'timestamp': latest['DATAHORA_MEDICAO'].to_numpy(),
+                'fault_probability': risk_scores,
+                'predicted_class': (risk_scores > 0.5).astype(int),
+                'alert_level': np.select(
+                    [risk_scores > 0.7, risk_scores > 0.4], ['HIGH', 'MEDIUM'], 'LOW'
+                )
+            })
+            self.metrics.ml_predictions += len(predictions_df)
             
-            # Processar por equipamento
-            for equipment_id in df['ID_MAQUINA'].unique():
-                eq_data = df[df['ID_MAQUINA'] == equipment_id].tail(1)  # Última leitura
-                
-                if not eq_data.empty:
-                    row = eq_data.iloc[0]
-                    
-                    # Preparar dados para predição
-                    sensor_data = {
-                        'temperature': row.get('VL_TEMPERATURA', 0),
-                        'pressure': row.get('VL_PRESSAO', 0),
-                        'vibration': row.get('VL_VIBRACAO', 0),
-                        'humidity': row.get('VL_HUMIDADE', 0),
-                        'vibration_x': row.get('VL_VIBR_X', 0),
-                        'vibration_y': row.get('VL_VIBR_Y', 0),
-                        'vibration_z': row.get('VL_VIBR_Z', 0),
-                        'gyro_x': row.get('VL_GYRO_X', 0),
-                        'gyro_y': row.get('VL_GYRO_Y', 0),
-                        'gyro_z': row.get('VL_GYRO_Z', 0)
-                    }
-                    
-                    # Fazer predição (simulada por enquanto)
-                    # result = self.ml_pipeline.predict_maintenance(equipment_id, sensor_data)
-                    
-                    # Simular resultado
-                    risk_score = min(1.0, max(0.0, 
-                        (sensor_data['temperature'] - 70) / 30 +
-                        (sensor_data['vibration'] - 2) / 8 +
-                        np.random.normal(0, 0.1)
-                    ))
-                    
-                    predictions.append({
-                        'equipment_id': equipment_id,
-                        'timestamp': row['DATAHORA_MEDICAO'],
-                        'fault_probability': risk_score,
-                        'predicted_class': 1 if risk_score > 0.5 else 0,
-                        'alert_level': 'HIGH' if risk_score > 0.7 else 'MEDIUM' if risk_score > 0.4 else 'LOW'
-                    })
-            
-            predictions_df = pd.DataFrame(predictions)
-            self.metrics.ml_predictions += len(predictions)
-            
-            self.logger.info(f"ML predições concluídas: {len(predictions)} equipamentos analisados")
+            self.logger.info(f"ML predições concluídas: {len(predictions_df)} equipamentos analisados")
             return predictions_df
             
         except Exception as e:
@@ -602,8 +853,10 @@ class SmartMaintenanceETLPipeline:
                 self.metrics.errors_count += 1
                 return False
             
-            # 3. TRANSFORM - Limpeza e transformação
+            # 3. TRANSFORM - Limpeza e transformação (df_raw é consumido aqui)
+            raw_count = len(df_raw)
             df_clean = self.clean_and_transform_data(df_raw)
+            del df_raw
             
             # 4. AGGREGATIONS - Criar agregações
             aggregations = self.aggregate_data_for_reporting(df_clean)
@@ -611,17 +864,17 @@ class SmartMaintenanceETLPipeline:
             # 5. ML PREDICTIONS - Executar predições
             predictions_df = self.run_ml_predictions(df_clean)
             
-            # 6. LOAD - Carregar resultados
-            # Carregar agregações
+            # 6/7. LOAD + EXPORT - Carregar agregações no banco e exportar arquivos em
+            # paralelo (I/O independente; ambos só leem os DataFrames)
+            io_futures = [self.executor.submit(self.export_data_to_files, df_clean, aggregations)]
             if aggregations:
-                self.load_aggregated_data(aggregations)
-            
-            # 7. EXPORT - Exportar para arquivos
-            self.export_data_to_files(df_clean, aggregations)
+                io_futures.append(self.executor.submit(self.load_aggregated_data, aggregations))
+            for future in io_futures:
+                future.result()
             
             # 8. UPDATE METRICS - Atualizar métricas
             cycle_time = (datetime.now() - cycle_start).total_seconds()
-            self.metrics.records_processed += len(df_raw)
+            self.metrics.records_processed += raw_count
             self.metrics.last_run_time = datetime.now()
             self.metrics.average_processing_time = (
                 (self.metrics.average_processing_time + cycle_time) / 2
@@ -629,7 +882,7 @@ class SmartMaintenanceETLPipeline:
                 else cycle_time
             )
             
-            self.logger.info(f"Ciclo ETL concluído em {cycle_time:.2f}s - {len(df_raw)} registros processados")
+            self.logger.info(f"Ciclo ETL concluído em {cycle_time:.2f}s - {raw_count} registros processados")
             return True
             
         except Exception as e:
@@ -669,13 +922,8 @@ class SmartMaintenanceETLPipeline:
             cutoff_date = datetime.now() - timedelta(days=PIPELINE_CONFIG['data_retention_days'])
             
             # Cleanup em tabelas temporárias de agregação
-            cleanup_query = """
-            DELETE FROM T_AGG_EQUIPMENT_SUMMARY 
-            WHERE created_date < :cutoff_date
-            """
-            
             with self.db_engine.connect() as conn:
-                result = conn.execute(text(cleanup_query), {'cutoff_date': cutoff_date})
+                result = conn.execute(CLEANUP_AGGREGATES_SQL, {'cutoff_date': cutoff_date})
                 
             self.logger.info(f"Cleanup executado: dados anteriores a {cutoff_date}")
             return True
@@ -695,7 +943,7 @@ class SmartMaintenanceETLPipeline:
             db_healthy = False
             try:
                 with self.db_engine.connect() as conn:
-                    conn.execute(text("SELECT 1 FROM DUAL"))
+                    conn.execute(PING_SQL)
                 db_healthy = True
             except:
                 pass